@@ -0,0 +1,162 @@
+#%% burrito challenge built in matrix form (scipy sparse arrays instead of pyomo expressions)
+import numpy as np
+import time # count clock time
+from pyomo.environ import ConcreteModel, Set, Param, Var, Binary, Constraint, Objective, maximize, value
+from pyomo.opt import SolverFactory
+from scipy.optimize import milp, LinearConstraint, Bounds
+from scipy.sparse import coo_array, vstack
+
+import pandas as pd
+
+from burrito_tools import candidate_pairs
+
+#%% read input data
+input_data_folder = 'round1-day1'
+
+df_demand_data       = pd.read_csv('.\\'+input_data_folder+'\\demand_node_data.csv' , index_col=0)
+df_truck_data        = pd.read_csv('.\\'+input_data_folder+'\\truck_node_data.csv'  , index_col=0)
+df_demand_truck_data = pd.read_csv('.\\'+input_data_folder+'\\demand_truck_data.csv', index_col=[0,1])
+df_problem_data      = pd.read_csv('.\\'+input_data_folder+'\\problem_data.csv')
+
+# random instance (customers, trucks) with the pairs generated from the coordinates (None -> input_data_folder)
+RandomSize = None
+
+if RandomSize is not None:
+    rng  = np.random.default_rng(0)
+    Side = 30*np.sqrt(RandomSize[0]) # side of the city (same density of customers for any size)
+    df_demand_data = pd.DataFrame({'x': rng.uniform(0,Side,RandomSize[0]), 'y': rng.uniform(0,Side,RandomSize[0]), 'demand': rng.choice([5,10,20,30,40],RandomSize[0])}, index=['demand'+str(i) for i in range(RandomSize[0])])
+    df_truck_data  = pd.DataFrame({'x': rng.uniform(0,Side,RandomSize[1]), 'y': rng.uniform(0,Side,RandomSize[1])}, index=['truck'+str(j) for j in range(RandomSize[1])])
+    df_demand_truck_data = candidate_pairs(df_demand_data, df_truck_data)
+
+# only the pairs with demand
+df_demand_truck_data = df_demand_truck_data[df_demand_truck_data['scaled_demand']>0]
+
+F =  df_problem_data.loc[0,'truck_cost']
+R =  df_problem_data.loc[0,'burrito_price']
+K =  df_problem_data.loc[0,'ingredient_cost']
+
+# solve the pyomo model too and check that both give the same solution
+CompareWithPyomo = True
+
+#%% matrix form
+# columns: vX (one per truck) and then vY (one per customer-truck pair), every one binary
+# rows   : eAssignation1 (one per customer with pairs) and then eAssignation2 (one per pair)
+# the objective is the negative profit (minimize)
+
+def matrix_model(df_demand_data, df_truck_data, df_demand_truck_data, F, R, K):
+    nJ = len(df_truck_data)
+    nP = len(df_demand_truck_data)
+    pi = df_demand_data.index.get_indexer(df_demand_truck_data.index.get_level_values(0)) # customer of each pair
+    pj = df_truck_data .index.get_indexer(df_demand_truck_data.index.get_level_values(1)) # truck    of each pair
+    served, pi = np.unique(pi, return_inverse=True) # only the customers with pairs get a row
+
+    c = np.concatenate([np.full(nJ, F, dtype=float), -(R-K)*df_demand_truck_data['scaled_demand'].to_numpy(dtype=float)])
+
+    # sum(vY[i,j] for j) <= 1
+    A1 = coo_array((np.ones(nP), (pi, nJ+np.arange(nP))), shape=(len(served), nJ+nP))
+    # vY[i,j] - vX[j] <= 0
+    A2 = coo_array((np.concatenate([np.ones(nP), -np.ones(nP)]), (np.tile(np.arange(nP),2), np.concatenate([nJ+np.arange(nP), pj]))), shape=(nP, nJ+nP))
+
+    return {'c'      : c,
+            'A'      : vstack([A1, A2]).tocsc(),
+            'ub'     : np.concatenate([np.ones(len(served)), np.zeros(nP)]),
+            'columns': np.concatenate(['vX('+df_truck_data.index.astype(str)+')', 'vY('+df_demand_truck_data.index.get_level_values(0).astype(str)+'_'+df_demand_truck_data.index.get_level_values(1).astype(str)+')']),
+            'rows'   : np.concatenate(['eAssignation1('+df_demand_data.index[served].astype(str)+')', 'eAssignation2('+df_demand_truck_data.index.get_level_values(0).astype(str)+'_'+df_demand_truck_data.index.get_level_values(1).astype(str)+')'])}
+
+def write_mps(mm, filename):
+    # free MPS with every column binary (the rows are <= constraints). The lines are built as whole columns of strings
+    A = mm['A']
+    col = np.repeat(np.arange(A.shape[1]), np.diff(A.indptr)) # column of each nonzero (csc)
+    entries = pd.DataFrame({'column': np.concatenate([np.arange(A.shape[1]), col]),
+                            'line'  : np.concatenate([np.full(A.shape[1], ' OBJ '), ' '+mm['rows'][A.indices]+' '])+np.concatenate([mm['c'], A.data]).astype(str)})
+    entries = entries[np.concatenate([mm['c'] != 0, A.data != 0])].sort_values('column', kind='stable') # objective first in each column
+    with open(filename, 'w') as f:
+        f.write('NAME BurritoChallange\nROWS\n N OBJ\n')
+        f.write('\n'.join(' L '+mm['rows'])+'\n')
+        f.write("COLUMNS\n    MARKER 'MARKER' 'INTORG'\n")
+        f.write('\n'.join(mm['columns'][entries['column'].to_numpy()]+entries['line'].to_numpy())+'\n')
+        f.write("    MARKER 'MARKER' 'INTEND'\nRHS\n")
+        f.write('\n'.join(' RHS '+mm['rows'][mm['ub'] != 0]+' '+mm['ub'][mm['ub'] != 0].astype(str))+'\n')
+        f.write('BOUNDS\n')
+        f.write('\n'.join(' BV BND '+mm['columns'])+'\n')
+        f.write('ENDATA\n')
+
+#%% pyomo model (same formulation as burrito-challange-day1-tight.py)
+
+def pyomo_model(df_demand_data, df_truck_data, df_demand_truck_data, F, R, K):
+    I  = list(df_demand_data.index.map(str))
+    J  = list(df_truck_data.index.map(str))
+    IJ = list(df_demand_truck_data.index)
+    Ji = {i: [] for i in I}
+    for i,j in IJ:
+        Ji[i].append(j)
+
+    mBurrito = ConcreteModel(name='Burrito Challange')
+
+    mBurrito.i = Set(initialize=I, doc='customers')
+    mBurrito.j = Set(initialize=J, doc='trucks')
+    mBurrito.ij= Set(initialize=IJ, within=mBurrito.i*mBurrito.j, doc='customer-truck pairs')
+
+    mBurrito.pA = Param(mBurrito.ij, initialize=dict(zip(IJ,df_demand_truck_data['scaled_demand'])), doc='demand multiplier for customer i and truck j')
+    mBurrito.pF = Param(initialize=F,doc='truck fixed cost')
+    mBurrito.pR = Param(initialize=R,doc='revenue per burrito sold')
+    mBurrito.pK = Param(initialize=K,doc='cost per burrito sold')
+
+    mBurrito.vX = Var(mBurrito.j , within=Binary, doc='1 if we locate a truck at j')
+    mBurrito.vY = Var(mBurrito.ij, within=Binary, doc='1 if we assing demand i to truck at j')
+
+    mBurrito.eAssignation1 = Constraint(mBurrito.i , rule=lambda mBurrito,i  : sum(mBurrito.vY[i,j] for j in Ji[i]) <= 1 if Ji[i] else Constraint.Skip, doc='each customer may be assigned to at most one truck')
+    mBurrito.eAssignation2 = Constraint(mBurrito.ij, rule=lambda mBurrito,i,j: mBurrito.vY[i,j] <= mBurrito.vX[j], doc='a customer can only be served by a truck')
+
+    mBurrito.ObjFun = Objective(expr=sum((mBurrito.pR-mBurrito.pK)*mBurrito.pA[i,j]*mBurrito.vY[i,j] for i,j in mBurrito.ij) - sum(mBurrito.pF*mBurrito.vX[j] for j in mBurrito.j), sense=maximize, doc='total profit')
+    return mBurrito
+
+#%% building and solving the matrix model (HiGHS in process through scipy)
+
+StartTime = time.time()
+mm = matrix_model(df_demand_data, df_truck_data, df_demand_truck_data, F, R, K)
+MatrixBuildTime = time.time() - StartTime
+print('Matrix build time... ', round(MatrixBuildTime,3), 's', mm['A'].shape, mm['A'].nnz, 'nonzeros')
+
+# the mps file can be solved by any external solver (e.g. cbc burrito-matrix.mps solve)
+StartTime = time.time()
+write_mps(mm, 'burrito-matrix.mps')
+print('MPS write time... ', round(time.time()-StartTime,3), 's')
+
+StartTime = time.time()
+SolverResults = milp(mm['c'], constraints=LinearConstraint(mm['A'], -np.inf, mm['ub']), integrality=np.ones(len(mm['c'])), bounds=Bounds(0,1))
+print('Matrix solving time... ', round(time.time()-StartTime,3), 's', SolverResults.message)
+
+MatrixProfit = -SolverResults.fun
+MatrixTrucks = sorted(df_truck_data.index[np.round(SolverResults.x[:len(df_truck_data)]) > 0.5].astype(str))
+print('profit: {}, trucks: {}'.format(MatrixProfit, MatrixTrucks))
+
+#%% solver definition
+
+# CBC
+SolverName     = 'cbc'
+SolverPath_exe = 'C:\\cbc-win64\\cbc'
+Solver = SolverFactory(SolverName,executable=SolverPath_exe)
+
+# GUROBI (pip install gurobipy)
+#SolverName     = 'gurobi'
+#Solver = SolverFactory(SolverName)
+
+#%% building and solving the pyomo model and comparing both solutions
+
+if CompareWithPyomo:
+    StartTime = time.time()
+    mBurrito = pyomo_model(df_demand_data, df_truck_data, df_demand_truck_data, F, R, K)
+    PyomoBuildTime = time.time() - StartTime
+    print('Pyomo build time... ', round(PyomoBuildTime,3), 's')
+
+    Solver.solve(mBurrito)
+    PyomoProfit = value(mBurrito.ObjFun)
+    PyomoTrucks = sorted(j for j in mBurrito.j if mBurrito.vX[j].value > 0.5)
+    print('profit: {}, trucks: {}'.format(PyomoProfit, PyomoTrucks))
+
+    # same optimal profit (the trucks may differ if there are alternative optima)
+    assert abs(PyomoProfit-MatrixProfit) <= 1e-6*max(1,abs(PyomoProfit)), 'the matrix and the pyomo models give different profits'
+    print('same profit: True, same trucks: {}'.format(PyomoTrucks == MatrixTrucks))
+
+# %%
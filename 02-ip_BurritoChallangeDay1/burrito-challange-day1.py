@@ -2,23 +2,43 @@
 from pyomo.environ import ConcreteModel, Set, Param, Var, Binary, Constraint, Objective, maximize, Suffix
 from pyomo.opt import SolverFactory
 
+import numpy as np
 import pandas as pd
 
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+
+from burrito_tools import candidate_pairs
 
 #%% read input data
 input_data_folder = 'round1-day1'
 
+# customer-truck pairs: False -> demand_truck_data.csv, True -> generated from the coordinates (trucks closer than
+# PairRadius and the PairNearest nearest ones, None -> no limit) with straight-line distances
+GeneratePairs = False
+PairRadius    = 300
+PairNearest   = None
+
 df_demand_data       = pd.read_csv('.\\'+input_data_folder+'\\demand_node_data.csv' , index_col=0)
 df_truck_data        = pd.read_csv('.\\'+input_data_folder+'\\truck_node_data.csv'  , index_col=0)
-df_demand_truck_data = pd.read_csv('.\\'+input_data_folder+'\\demand_truck_data.csv', index_col=[0,1])
 df_problem_data      = pd.read_csv('.\\'+input_data_folder+'\\problem_data.csv')
 
+if GeneratePairs:
+    df_demand_truck_data = candidate_pairs(df_demand_data, df_truck_data, radius=PairRadius, k=PairNearest)
+else:
+    df_demand_truck_data = pd.read_csv('.\\'+input_data_folder+'\\demand_truck_data.csv', index_col=[0,1])
+
 I = list(df_demand_data.index.map(str))
 J = list(df_truck_data.index.map(str))
+IJ= list(df_demand_truck_data.index) # customer-truck pairs (only the listed or generated ones)
 
 Di = dict(zip(df_demand_data.index,df_demand_data['demand']))
-Aij= dict(zip(df_demand_truck_data.index,df_demand_truck_data['scaled_demand']))
+Aij= dict(zip(IJ,df_demand_truck_data['scaled_demand']))
+
+# trucks that can serve each customer
+Ji = {i: [] for i in I}
+for i,j in IJ:
+    Ji[i].append(j)
 
 F =  df_problem_data.loc[0,'truck_cost']
 R =  df_problem_data.loc[0,'burrito_price']
@@ -32,10 +52,11 @@ mBurrito = ConcreteModel(name='Burrito Challange')
 # sets
 mBurrito.i = Set(initialize=I, doc='customers')
 mBurrito.j = Set(initialize=J, doc='trucks')
+mBurrito.ij= Set(initialize=IJ, within=mBurrito.i*mBurrito.j, doc='customer-truck pairs')
 
 # parameters
 mBurrito.pD = Param(mBurrito.i,            initialize=Di , doc='customers demand')
-mBurrito.pA = Param(mBurrito.i,mBurrito.j, initialize=Aij, doc='demand multiplier for customer i and truck j')
+mBurrito.pA = Param(mBurrito.ij,           initialize=Aij, doc='demand multiplier for customer i and truck j')
 
 mBurrito.pF = Param(initialize=F,doc='truck fixed cost')
 mBurrito.pR = Param(initialize=R,doc='revenue per burrito sold')
@@ -43,20 +64,22 @@ mBurrito.pK = Param(initialize=K,doc='cost per burrito sold')
 
 # variables
 mBurrito.vX = Var(           mBurrito.j, within=Binary, doc='1 if we assing demand i to truck at j')
-mBurrito.vY = Var(mBurrito.i,mBurrito.j, within=Binary, doc='1 if we locate a truck at j')
+mBurrito.vY = Var(mBurrito.ij,           within=Binary, doc='1 if we locate a truck at j')
 
 # constraints
 def eAssignation1(mBurrito,i):
-    return sum(mBurrito.vY[i,j] for j in mBurrito.j) <= 1
+    if not Ji[i]:
+        return Constraint.Skip
+    return sum(mBurrito.vY[i,j] for j in Ji[i]) <= 1
 mBurrito.eAssignation1 = Constraint(mBurrito.i,rule=eAssignation1,doc='each customer may be assigned to at most one truck')
 
 def eAssignation2(mBurrito,i,j):
     return mBurrito.vY[i,j] <= mBurrito.vX[j]
-mBurrito.eAssignation2 = Constraint(mBurrito.i,mBurrito.j,rule=eAssignation2,doc='a customer can only be served by a truck')
+mBurrito.eAssignation2 = Constraint(mBurrito.ij,rule=eAssignation2,doc='a customer can only be served by a truck')
 
 # objective function
 def eProfit(mBurrito):
-    return (+ sum((mBurrito.pR-mBurrito.pK)*mBurrito.pA[i,j]*mBurrito.vY[i,j] for i in mBurrito.i for j in mBurrito.j)
+    return (+ sum((mBurrito.pR-mBurrito.pK)*mBurrito.pA[i,j]*mBurrito.vY[i,j] for i,j in mBurrito.ij)
             - sum (mBurrito.pF*mBurrito.vX[j] for j in mBurrito.j))
 mBurrito.ObjFun = Objective(rule=eProfit, sense=maximize, doc='total profit')
 
@@ -98,20 +121,30 @@ mBurrito.vY.pprint()
 
 # %% plot
 
+PlotDpi  = 500   # resolution of the png file
+Headless = False # True -> no window (Agg backend), the plot is only saved in the file
+
+if Headless:
+    plt.switch_backend('Agg')
+
 trucks = [mBurrito.vX[j].value for j in J]
 
+# selected edges in one pass over vY and their end points by array indexing
+sY    = pd.Series(mBurrito.vY.extract_values(), dtype=float)
+edges = sY[sY > 0.5].index
+xy_i  = df_demand_data[['x','y']].to_numpy()[df_demand_data.index.get_indexer(edges.get_level_values(0))]
+xy_j  = df_truck_data [['x','y']].to_numpy()[df_truck_data .index.get_indexer(edges.get_level_values(1))]
+
 fig = plt.figure(figsize=(7,7))
 
 plt.scatter(x=df_truck_data ['x'],y=df_truck_data ['y'],c=trucks,marker='s',cmap='Pastel2_r')
 plt.scatter(x=df_demand_data['x'],y=df_demand_data['y'],marker='o',s=10*df_demand_data['demand'],color='cornflowerblue')
 
-edges = ((i,j) for i in mBurrito.i for j in mBurrito.j if mBurrito.vY[i,j].value==1.0)
-
-for i,j in edges:
-    plt.plot([df_truck_data.loc[j,'x'],df_demand_data.loc[i,'x']],[df_truck_data.loc[j,'y'],df_demand_data.loc[i,'y']],color='indianred',linestyle='dashed')
+# one collection for every edge
+plt.gca().add_collection(LineCollection(np.stack([xy_j, xy_i], axis=1), colors='indianred', linestyles='dashed'))
 
 plt.axis('off')
-plt.savefig('burrito-challange-day1.png',dpi=500)
-plt.show
+plt.savefig('burrito-challange-day1.png',dpi=PlotDpi)
+plt.show()
 
 # %%
@@ -0,0 +1,186 @@
+#%% burrito challenge for every day (roundX-dayY folders) updating the data of one model per run of consecutive days with the same candidate set
+import os
+import re
+import time # count clock time
+from itertools import groupby
+from concurrent.futures import ProcessPoolExecutor
+from pyomo.environ import ConcreteModel, Set, Param, Var, Binary, Constraint, Objective, maximize, value
+from pyomo.opt import SolverFactory
+
+import pandas as pd
+
+#%% parameters
+
+InputDataRoot = '.'                     # folder with the roundX-dayY folders
+OutputFile    = 'burrito-days.parquet'  # one row per day and truck (csv if there is no parquet engine)
+
+# True  -> the groups of days with different candidate sets (customer-truck pairs) are solved in separate processes
+# False -> every group in this process
+Parallel = True
+
+#%% input data
+
+def discover_days(root):
+    # roundX-dayY folders sorted by round and day
+    days = []
+    for folder in os.listdir(root):
+        match = re.fullmatch(r'round(\d+)-day(\d+)', folder)
+        if match and os.path.isdir(os.path.join(root, folder)):
+            days.append((int(match.group(1)), int(match.group(2)), os.path.join(root, folder)))
+    return sorted(days)
+
+def read_day(folder):
+    df_demand_data       = pd.read_csv(os.path.join(folder,'demand_node_data.csv' ), index_col=0)
+    df_truck_data        = pd.read_csv(os.path.join(folder,'truck_node_data.csv'  ), index_col=0)
+    df_demand_truck_data = pd.read_csv(os.path.join(folder,'demand_truck_data.csv'), index_col=[0,1])
+    df_problem_data      = pd.read_csv(os.path.join(folder,'problem_data.csv'     ))
+    return {'I'  : list(df_demand_data.index.map(str)),
+            'J'  : list(df_truck_data.index.map(str)),
+            'IJ' : list(df_demand_truck_data.index),
+            'Di' : dict(zip(df_demand_data.index,df_demand_data['demand'])),
+            'Aij': dict(zip(df_demand_truck_data.index,df_demand_truck_data['scaled_demand'])),
+            'F'  : df_problem_data.loc[0,'truck_cost'     ],
+            'R'  : df_problem_data.loc[0,'burrito_price'  ],
+            'K'  : df_problem_data.loc[0,'ingredient_cost']}
+
+def candidate_set(data):
+    # days with the same customers, trucks and pairs share the model
+    return (tuple(data['I']), tuple(data['J']), tuple(sorted(data['IJ'])))
+
+#%% model (same formulation as burrito-challange-day1.py with mutable parameters)
+
+def build_model(data):
+    Ji = {i: [] for i in data['I']}
+    for i,j in data['IJ']:
+        Ji[i].append(j)
+
+    mBurrito = ConcreteModel(name='Burrito Challange')
+
+    mBurrito.i = Set(initialize=data['I'], doc='customers')
+    mBurrito.j = Set(initialize=data['J'], doc='trucks')
+    mBurrito.ij= Set(initialize=data['IJ'], within=mBurrito.i*mBurrito.j, doc='customer-truck pairs')
+
+    mBurrito.pD = Param(mBurrito.i , initialize=data['Di'] , mutable=True, doc='customers demand')
+    mBurrito.pA = Param(mBurrito.ij, initialize=data['Aij'], mutable=True, doc='demand multiplier for customer i and truck j')
+    mBurrito.pF = Param(initialize=data['F'], mutable=True, doc='truck fixed cost')
+    mBurrito.pR = Param(initialize=data['R'], mutable=True, doc='revenue per burrito sold')
+    mBurrito.pK = Param(initialize=data['K'], mutable=True, doc='cost per burrito sold')
+
+    mBurrito.vX = Var(mBurrito.j , within=Binary, doc='1 if we locate a truck at j')
+    mBurrito.vY = Var(mBurrito.ij, within=Binary, doc='1 if we assing demand i to truck at j')
+
+    def eAssignation1(mBurrito,i):
+        if not Ji[i]:
+            return Constraint.Skip
+        return sum(mBurrito.vY[i,j] for j in Ji[i]) <= 1
+    mBurrito.eAssignation1 = Constraint(mBurrito.i,rule=eAssignation1,doc='each customer may be assigned to at most one truck')
+
+    def eAssignation2(mBurrito,i,j):
+        return mBurrito.vY[i,j] <= mBurrito.vX[j]
+    mBurrito.eAssignation2 = Constraint(mBurrito.ij,rule=eAssignation2,doc='a customer can only be served by a truck')
+
+    def eProfit(mBurrito):
+        return (+ sum((mBurrito.pR-mBurrito.pK)*mBurrito.pA[i,j]*mBurrito.vY[i,j] for i,j in mBurrito.ij)
+                - sum (mBurrito.pF*mBurrito.vX[j] for j in mBurrito.j))
+    mBurrito.ObjFun = Objective(rule=eProfit, sense=maximize, doc='total profit')
+    return mBurrito
+
+def update_model(mBurrito, data):
+    # only the values of the parameters change (the expressions keep the references to them)
+    mBurrito.pD.store_values(data['Di'])
+    mBurrito.pA.store_values(data['Aij'])
+    mBurrito.pF.set_value(data['F'])
+    mBurrito.pR.set_value(data['R'])
+    mBurrito.pK.set_value(data['K'])
+
+def warm_start(mBurrito, trucks):
+    # trucks of the previous day and each customer assigned to its best open truck
+    for j in mBurrito.j:
+        mBurrito.vX[j].value = 1 if j in trucks else 0
+    best = {}
+    for i,j in mBurrito.ij:
+        mBurrito.vY[i,j].value = 0
+        if j in trucks and value(mBurrito.pA[i,j]) > 0 and (i not in best or value(mBurrito.pA[i,j]) > value(mBurrito.pA[best[i]])):
+            best[i] = (i,j)
+    for ij in best.values():
+        mBurrito.vY[ij].value = 1
+
+#%% solver definition
+
+def solver_definition():
+    # CBC
+    SolverName     = 'cbc'
+    SolverPath_exe = 'C:\\cbc-win64\\cbc'
+    Solver = SolverFactory(SolverName,executable=SolverPath_exe)
+
+    # GUROBI (pip install gurobipy)
+    #SolverName     = 'gurobi'
+    #Solver = SolverFactory(SolverName)
+    return Solver
+
+#%% solving the days
+
+def solve_days(days):
+    # consecutive days (already read) with the same candidate set: the model is built for the first one and then only updated
+    Solver   = solver_definition()
+    mBurrito = None
+    trucks   = None
+    Results  = []
+    for rnd, day, data in days:
+        StartTime = time.time()
+        if mBurrito is None:
+            mBurrito = build_model(data)
+        else:
+            update_model(mBurrito, data)
+        if trucks is not None:
+            warm_start(mBurrito, trucks)
+        BuildTime = time.time() - StartTime
+
+        StartTime = time.time()
+        SolverResults = Solver.solve(mBurrito, warmstart=trucks is not None)
+        SolvingTime = time.time() - StartTime
+
+        trucks = {j for j in mBurrito.j if mBurrito.vX[j].value > 0.5}
+        served = {j: [] for j in mBurrito.j}
+        for i,j in mBurrito.ij:
+            if mBurrito.vY[i,j].value > 0.5:
+                served[j].append(i)
+        for j in mBurrito.j:
+            Results.append({'round'      : rnd,
+                            'day'        : day,
+                            'truck'      : j,
+                            'open'       : j in trucks,
+                            'customers'  : len(served[j]),
+                            'burritos'   : sum(value(mBurrito.pA[i,j]) for i in served[j]),
+                            'profit'     : value(mBurrito.ObjFun),
+                            'build [s]'  : BuildTime,
+                            'solve [s]'  : SolvingTime,
+                            'termination': str(SolverResults.solver.termination_condition)})
+    return Results
+
+#%% pipeline (the process pool needs the main guard)
+
+if __name__ == '__main__':
+    # every day is read once and the groups are runs of consecutive days (in order) with the same candidate set,
+    # so the warm start only comes from the previous day
+    days   = [(rnd, day, read_day(folder)) for rnd, day, folder in discover_days(InputDataRoot)]
+    groups = [list(g) for _, g in groupby(days, key=lambda d: candidate_set(d[2]))]
+    print('{} days in {} groups of consecutive days with the same candidate set'.format(len(days), len(groups)))
+
+    if Parallel and len(groups) > 1:
+        with ProcessPoolExecutor() as pool:
+            Results = [r for rs in pool.map(solve_days, groups) for r in rs]
+    else:
+        Results = [r for days in groups for r in solve_days(days)]
+
+    df_results = pd.DataFrame(Results).sort_values(['round','day','truck']).reset_index(drop=True)
+    print(df_results[df_results['open']].groupby(['round','day']).agg(trucks=('truck','count'), burritos=('burritos','sum'), profit=('profit','first'), solve=('solve [s]','first')))
+
+    try:
+        df_results.to_parquet(OutputFile, index=False)
+    except ImportError: # no parquet engine (pip install pyarrow)
+        OutputFile = os.path.splitext(OutputFile)[0]+'.csv'
+        df_results.to_csv(OutputFile, index=False)
+    print('results written to', OutputFile)
+
+# %%
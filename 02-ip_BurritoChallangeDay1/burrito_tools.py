@@ -0,0 +1,144 @@
+#%% helper functions for the burrito challenge (candidate customer-truck pairs from the coordinates)
+import numpy as np
+import pandas as pd
+import time # count clock time
+from scipy.spatial import cKDTree
+
+# the demand of a customer decreases linearly with the distance to the truck: all of it is served
+# up to NearDistance and none beyond FarDistance (scaled_demand of demand_truck_data.csv)
+NearDistance = 100
+FarDistance  = 300
+
+#%% scaled demand
+
+def scaled_demand(demand, distance, near=NearDistance, far=FarDistance):
+    """demand served by a truck at the given distance (vectorized, rounded to integer burritos)"""
+    return np.floor(np.asarray(demand)*np.clip(1-(np.asarray(distance)-near)/(far-near), 0, 1) + 0.5).astype(int)
+
+#%% candidate pairs
+
+def _radius_pairs(xy_i, xy_j, radius):
+    """pairs (i,j) of points closer than radius (kd-trees of both sets of points)"""
+    pairs = cKDTree(xy_i).sparse_distance_matrix(cKDTree(xy_j), radius, output_type='ndarray')
+    keep  = pairs['v'] < radius
+    return pairs['i'][keep].astype(np.int64), pairs['j'][keep].astype(np.int64), pairs['v'][keep]
+
+def candidate_pairs(df_demand_data, df_truck_data, radius=FarDistance, k=None, near=NearDistance, far=FarDistance):
+    """customer-truck pairs with the same columns as demand_truck_data.csv (distance and scaled_demand),
+    built from the coordinates of demand_node_data.csv and truck_node_data.csv. Only the trucks closer than
+    radius (and the k nearest ones if k is given) are candidates for each customer. The distance is the
+    straight-line distance between the coordinates, so it is an approximation of the distances of the
+    precomputed demand_truck_data.csv"""
+    xy_i = df_demand_data[['x','y']].to_numpy(dtype=float)
+    xy_j = df_truck_data [['x','y']].to_numpy(dtype=float)
+    i, j, d = _radius_pairs(xy_i, xy_j, radius)
+
+    # sorted by customer and distance (the k nearest trucks are the first ones of each customer)
+    order   = np.lexsort((d, i))
+    i, j, d = i[order], j[order], d[order]
+    if k is not None:
+        rank = np.arange(len(i)) - np.searchsorted(i, i, side='left')
+        i, j, d = i[rank < k], j[rank < k], d[rank < k]
+
+    df = pd.DataFrame({'demand_node_index': df_demand_data.index[i],
+                       'truck_node_index' : df_truck_data .index[j],
+                       'distance'         : d,
+                       'scaled_demand'    : scaled_demand(df_demand_data['demand'].to_numpy()[i], d, near, far)})
+    return df.set_index(['demand_node_index','truck_node_index'])
+
+#%% lagrangian relaxation and greedy heuristic
+
+# the pairs are arrays: customer (pi) and truck (pj) positions and the profit of serving the customer from
+# the truck (a = (R-K)*scaled_demand), only the pairs with a positive profit sorted by customer and decreasing
+# profit (the best truck of a customer is its first pair with an open truck). A plan is a boolean array with the open trucks
+
+def _best_truck(open, pi, pj, a, nI):
+    """best and second best profit of each customer with the open trucks (0 if there are none), and best pair"""
+    p = np.flatnonzero(open[pj])
+    c = pi[p]
+    first  = np.ones(len(p), dtype=bool)
+    first[1:] = c[1:] != c[:-1]
+    second = np.zeros(len(p), dtype=bool)
+    second[1:] = first[:-1] & ~first[1:]
+    best, best2, pair = np.zeros(nI), np.zeros(nI), np.full(nI, -1)
+    best [c[first ]] = a[p[first ]]
+    best2[c[second]] = a[p[second]]
+    pair [c[first ]] = p[first]
+    return best, best2, pair
+
+def greedy_add_drop(pi, pj, a, F, nI, nJ, open=None):
+    """local search over the open trucks: the trucks are opened (add) or closed (drop) while the profit improves.
+    In each pass the moves are taken by decreasing gain if they do not share customers with a move already
+    taken (their gains are independent). It returns the open trucks and the profit"""
+    open = np.zeros(nJ, dtype=bool) if open is None else open.copy()
+    bytruck = np.argsort(pj, kind='stable') # customers of each truck: pi[bytruck[start[j]:start[j+1]]]
+    start   = np.concatenate([[0], np.cumsum(np.bincount(pj, minlength=nJ))])
+    while True:
+        best, best2, pair = _best_truck(open, pi, pj, a, nI)
+        served = pair >= 0
+        gain = np.where(open, F - np.bincount(pj[pair[served]], (best-best2)[served], nJ),  # drop
+                              np.bincount(pj, np.maximum(0, a-best[pi]), nJ) - F)         # add
+        moves = np.flatnonzero(gain > 1e-9)
+        if len(moves) == 0:
+            return open, best.sum() - F*open.sum()
+        used = np.zeros(nI, dtype=bool)
+        for j in moves[np.argsort(-gain[moves])]:
+            customers = pi[bytruck[start[j]:start[j+1]]]
+            if not used[customers].any():
+                used[customers] = True
+                open[j] = ~open[j]
+
+def lagrangian(df_demand_data, df_truck_data, df_demand_truck_data, F, R, K, MaxIter=200, theta=2.0, HeurEvery=25):
+    """lagrangian relaxation of the assignment of each customer to at most one truck (eAssignation1). For
+    given multipliers the relaxation splits per truck (open it if the profit of the customers with a positive
+    reduced profit pays its cost), which gives an upper bound of the profit. The multipliers are updated with
+    subgradient steps (Polyak) and the open trucks of the relaxation start the greedy heuristic every HeurEvery
+    iterations if they changed (lower bound). It returns the bound, the best plan (open trucks and assigned pairs) and the gap.
+    An iteration and a greedy pass are a few numpy operations over the pairs, so the time grows with the number of
+    pairs: 200 iterations take about 2 s with 150000 pairs (5000 customers, 500 trucks) and 8-14 s with 600000 pairs
+    (20000 customers, 2000 trucks), two thirds of it in the greedy heuristic"""
+    StartTime = time.time()
+    nI, nJ = len(df_demand_data), len(df_truck_data)
+    pi = df_demand_data.index.get_indexer(df_demand_truck_data.index.get_level_values(0))
+    pj = df_truck_data .index.get_indexer(df_demand_truck_data.index.get_level_values(1))
+    a  = (R-K)*df_demand_truck_data['scaled_demand'].to_numpy(dtype=float)
+    # the pairs without profit are never used (the multipliers are not negative)
+    p  = np.flatnonzero(a > 0)
+    p  = p[np.lexsort((-a[p], pi[p]))]
+    pi, pj, a = pi[p], pj[p], a[p]
+
+    BestOpen, BestProfit = np.zeros(nJ, dtype=bool), 0.0 # every truck closed
+    Bound = np.inf
+    lam   = np.zeros(nI)
+    Start = None
+    for it in range(MaxIter):
+        reduced = np.maximum(0, a-lam[pi])
+        gain    = np.bincount(pj, reduced, nJ) - F
+        open    = gain > 0
+        Bound   = min(Bound, lam.sum() + gain[open].sum())
+
+        # subgradient of the relaxed constraints (1 - trucks assigned to each customer)
+        g = 1 - np.bincount(pi, (open[pj] & (reduced > 0)).astype(float), nI)
+        g[(lam <= 0) & (g > 0)] = 0 # the multiplier can not decrease below zero
+
+        if (it % HeurEvery == 0 or not g.any()) and (Start is None or (open != Start).any()):
+            Start = open
+            Open, Profit = greedy_add_drop(pi, pj, a, F, nI, nJ, open)
+            if Profit > BestProfit:
+                BestOpen, BestProfit = Open, Profit
+        if Bound-BestProfit <= 1e-6*max(1, abs(Bound)) or not g.any():
+            break
+        lam = np.maximum(0, lam - theta*(Bound-BestProfit)/(g @ g)*g)
+        if it % 20 == 19:
+            theta /= 2
+
+    best, best2, pair = _best_truck(BestOpen, pi, pj, a, nI)
+    return {'bound'     : float(Bound),
+            'profit'    : float(BestProfit),
+            'gap'       : float((Bound-BestProfit)/max(abs(Bound), 1e-9)),
+            'trucks'    : list(df_truck_data.index[BestOpen]),
+            'pairs'     : list(df_demand_truck_data.index[p[pair[pair >= 0]]]),
+            'iterations': it+1,
+            'time'      : time.time()-StartTime}
+
+# %%
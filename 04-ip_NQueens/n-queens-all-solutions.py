@@ -0,0 +1,121 @@
+#%% generic example in pyomo (all the solutions of the N queens problem)
+from pyomo.environ import ConcreteModel, Set, Var, Binary, Constraint, ConstraintList, Objective, maximize
+from pyomo.opt import SolverFactory, TerminationCondition
+import time # count clock time
+
+#%% read input data
+
+N = 8 # board size
+
+I = [i+1 for i in range(N)]
+
+MaxSolutions = None  # maximum number of solutions to find (None -> all of them)
+Symmetry     = False # True -> only canonical solutions under board rotations and reflections
+
+#%% definitions
+
+# model
+mNQ = ConcreteModel(name='N Queens (all solutions)')
+
+# sets
+mNQ.i = Set(initialize=I, doc='rows')
+mNQ.j = Set(initialize=mNQ.i, doc='columns')
+mNQ.d1= Set(initialize=range(1-N,N  ), doc='diagonals      (cells with the same i-j)')
+mNQ.d2= Set(initialize=range(2,2*N+1), doc='anti-diagonals (cells with the same i+j)')
+
+# variables
+mNQ.vX = Var(mNQ.i, mNQ.j, within=Binary, doc='1 if we select a quenn in position i,j')
+
+# constraints
+def eRow_rule(mNQ,i):
+    return sum(mNQ.vX[i,j] for j in mNQ.j)<=1
+mNQ.eRow = Constraint(mNQ.i, rule=eRow_rule, doc='one queen per row')
+
+def eCol_rule(mNQ,j):
+    return sum(mNQ.vX[i,j] for i in mNQ.i)<=1
+mNQ.eCol = Constraint(mNQ.j, rule=eCol_rule, doc='one queen per column')
+
+def eDiag_rule1(mNQ,d):
+    return sum(mNQ.vX[i,i-d] for i in range(max(1,1+d),min(N,N+d)+1))<=1
+mNQ.eDiag1 = Constraint(mNQ.d1, rule=eDiag_rule1, doc='one queen per diagonal')
+
+def eDiag_rule2(mNQ,d):
+    return sum(mNQ.vX[i,d-i] for i in range(max(1,d-N),min(N,d-1)+1))<=1
+mNQ.eDiag2 = Constraint(mNQ.d2, rule=eDiag_rule2, doc='one queen per anti-diagonal')
+
+def eAllQueens_rule(mNQ):
+    return sum(mNQ.vX[i,j] for i in mNQ.i for j in mNQ.j)==N
+mNQ.eAllQueens = Constraint(rule=eAllQueens_rule, doc='N queens in the board')
+
+# no-good cuts to avoid the solutions already found (added while enumerating)
+mNQ.eNoGood = ConstraintList(doc='no-good cuts')
+
+# objective function
+def eObj_rule(mNQ):
+    return sum(mNQ.vX[i,j] for i in mNQ.i for j in mNQ.j)
+mNQ.ObjFun = Objective(rule=eObj_rule, sense=maximize)
+
+#%% solver definition
+
+# CBC (no persistent interface, the model is sent again to the solver for each solution)
+SolverName     = 'cbc'
+SolverPath_exe = 'C:\\cbc-win64\\cbc'
+Solver = SolverFactory(SolverName,executable=SolverPath_exe)
+
+# GUROBI persistent (pip install gurobipy): the model is loaded once and the cuts are added to the same solver instance
+#SolverName     = 'gurobi_persistent'
+#Solver = SolverFactory(SolverName)
+
+Persistent = SolverName.endswith('_persistent')
+if Persistent:
+    Solver.set_instance(mNQ)
+
+#%% enumerating the solutions
+
+def symmetries(sol):
+    # the 8 images of a solution (column of the queen in each row) under rotations and reflections
+    images = []
+    for s in (sol, tuple(N+1-c for c in sol)): # reflection
+        for r in range(4):                       # rotations of 90 degrees
+            images.append(s)
+            rot = [0]*N
+            for i,c in enumerate(s, start=1):
+                rot[c-1] = N+1-i
+            s = tuple(rot)
+    return set(images)
+
+def enumerate_solutions(mNQ, Solver, MaxSolutions=None, Symmetry=False):
+    # generator of the solutions (column of the queen in each row) and the time to find each one
+    found = 0
+    while MaxSolutions is None or found < MaxSolutions:
+        StartTime = time.time()
+
+        SolverResults = Solver.solve(mNQ, load_solutions=False)
+        if SolverResults.solver.termination_condition != TerminationCondition.optimal:
+            return # no more solutions
+        if Persistent:
+            Solver.load_vars()
+        else:
+            mNQ.solutions.load_from(SolverResults)
+
+        sol = tuple(j for i in mNQ.i for j in mNQ.j if mNQ.vX[i,j].value > 0.5)
+
+        # no-good cut for the solution (and its symmetric images to only keep the canonical one)
+        for s in (symmetries(sol) if Symmetry else [sol]):
+            mNQ.eNoGood.add(sum(mNQ.vX[i,j] for i,j in zip(mNQ.i,s)) <= N-1)
+            if Persistent:
+                Solver.add_constraint(mNQ.eNoGood[len(mNQ.eNoGood)])
+
+        found += 1
+        yield (min(symmetries(sol)) if Symmetry else sol), time.time()-StartTime
+
+#%% solutions as they are found
+
+Solutions = []
+for sol,SolvingTime in enumerate_solutions(mNQ, Solver, MaxSolutions, Symmetry):
+    Solutions.append(sol)
+    print('Solution {}: {} ({:.3f} s)'.format(len(Solutions), sol, SolvingTime))
+
+print('Total solutions: {}'.format(len(Solutions)))
+
+# %%
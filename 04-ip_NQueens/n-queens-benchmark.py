@@ -0,0 +1,83 @@
+#%% benchmark of the N queens problem: bitboard backtracking vs pyomo model
+from pyomo.environ import ConcreteModel, Set, Var, Binary, Constraint, Objective, maximize
+from pyomo.opt import SolverFactory
+import time # count clock time
+
+import pandas as pd
+
+from nq_tools import count_solutions, solutions, validate
+
+#%% benchmark inputs
+
+Sizes      = [4, 6, 8, 10, 12, 16, 20, 24, 28] # board sizes
+MaxNCount  = 12                                # counting all the solutions only up to this size
+Processes  = None                              # processes to count the solutions (None -> all the cpus)
+
+#%% model (same formulation as n-queens.py)
+
+def build_model(N):
+    mNQ = ConcreteModel(name='N Queens')
+
+    mNQ.i = Set(initialize=[i+1 for i in range(N)], doc='rows')
+    mNQ.j = Set(initialize=mNQ.i, doc='columns')
+    mNQ.d1= Set(initialize=range(1-N,N  ), doc='diagonals      (cells with the same i-j)')
+    mNQ.d2= Set(initialize=range(2,2*N+1), doc='anti-diagonals (cells with the same i+j)')
+
+    mNQ.vX = Var(mNQ.i, mNQ.j, within=Binary, doc='1 if we select a quenn in position i,j')
+
+    mNQ.eRow   = Constraint(mNQ.i , rule=lambda mNQ,i: sum(mNQ.vX[i,j] for j in mNQ.j)<=1, doc='one queen per row')
+    mNQ.eCol   = Constraint(mNQ.j , rule=lambda mNQ,j: sum(mNQ.vX[i,j] for i in mNQ.i)<=1, doc='one queen per column')
+    mNQ.eDiag1 = Constraint(mNQ.d1, rule=lambda mNQ,d: sum(mNQ.vX[i,i-d] for i in range(max(1,1+d),min(N,N+d)+1))<=1, doc='one queen per diagonal')
+    mNQ.eDiag2 = Constraint(mNQ.d2, rule=lambda mNQ,d: sum(mNQ.vX[i,d-i] for i in range(max(1,d-N),min(N,d-1)+1))<=1, doc='one queen per anti-diagonal')
+
+    mNQ.ObjFun = Objective(expr=sum(mNQ.vX[i,j] for i in mNQ.i for j in mNQ.j), sense=maximize)
+    return mNQ
+
+#%% solver definition
+
+# CBC
+SolverName     = 'cbc'
+SolverPath_exe = 'C:\\cbc-win64\\cbc'
+Solver = SolverFactory(SolverName,executable=SolverPath_exe)
+
+# GUROBI (pip install gurobipy)
+#SolverName     = 'gurobi'
+#Solver = SolverFactory(SolverName)
+
+#%% benchmark (the process pool needs the main guard)
+
+if __name__ == '__main__':
+    Results = []
+    for N in Sizes:
+        # bitboard: first solution
+        StartTime = time.time()
+        first     = next(solutions(N), None)
+        BitFirst  = time.time() - StartTime
+
+        # bitboard: all the solutions
+        StartTime = time.time()
+        count     = count_solutions(N, Processes) if N <= MaxNCount else None
+        BitCount  = time.time() - StartTime       if N <= MaxNCount else None
+
+        # pyomo model: build and solve
+        StartTime = time.time()
+        mNQ       = build_model(N)
+        MipBuild  = time.time() - StartTime
+        StartTime = time.time()
+        Solver.solve(mNQ)
+        MipSolve  = time.time() - StartTime
+
+        Results.append({'N'            : N,
+                        'solutions'    : count,
+                        'bit first [s]': BitFirst,
+                        'bit count [s]': BitCount,
+                        'mip build [s]': MipBuild,
+                        'mip solve [s]': MipSolve,
+                        'mip valid'    : validate(mNQ.vX.extract_values(), N) if first is not None else None,
+                        'winner'       : 'bitboard' if BitFirst < MipBuild+MipSolve else 'mip'})
+        print(Results[-1])
+
+    df_results = pd.DataFrame(Results).set_index('N')
+    print(df_results)
+
+# %%
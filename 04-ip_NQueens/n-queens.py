@@ -2,8 +2,11 @@
 from pyomo.environ import ConcreteModel, Set, Param, Var, Binary, Constraint, Objective, maximize, Suffix
 from pyomo.opt import SolverFactory
 
+import numpy as np
 import matplotlib.pyplot as plt
 
+from nq_tools import validate
+
 #%% read input data
 
 N = 8 # board size
@@ -18,6 +21,8 @@ mNQ = ConcreteModel(name='N Queens')
 # sets
 mNQ.i = Set(initialize=I, doc='rows')
 mNQ.j = Set(initialize=mNQ.i, doc='columns')
+mNQ.d1= Set(initialize=range(1-N,N  ), doc='diagonals      (cells with the same i-j)')
+mNQ.d2= Set(initialize=range(2,2*N+1), doc='anti-diagonals (cells with the same i+j)')
 
 # variables
 mNQ.vX = Var(mNQ.i, mNQ.j, within=Binary, doc='1 if we select a quenn in position i,j')
@@ -31,23 +36,13 @@ def eCol_rule(mNQ,j):
     return sum(mNQ.vX[i,j] for i in mNQ.i)<=1
 mNQ.eCol = Constraint(mNQ.j, rule=eCol_rule, doc='one queen per column')
 
-def eDiag_rule1(mNQ,i,j):
-    totalQueen=0
-    for r in mNQ.i:
-        for c in mNQ.j:
-            if j-c==i-r:
-                totalQueen+=mNQ.vX[c,r] 
-    return totalQueen<=1
-mNQ.eDiag1 = Constraint(mNQ.i,mNQ.j, rule=eDiag_rule1, doc='one queen per diagonal')
-
-def eDiag_rule2(mNQ,i,j):
-    totalQueen=0
-    for r in mNQ.i:
-        for c in mNQ.j:
-            if j-c==-(i-r):
-                totalQueen+=mNQ.vX[c,r] 
-    return totalQueen<=1
-mNQ.eDiag2 = Constraint(mNQ.i,mNQ.j, rule=eDiag_rule2, doc='one queen per anti-diagonal')
+def eDiag_rule1(mNQ,d):
+    return sum(mNQ.vX[i,i-d] for i in range(max(1,1+d),min(N,N+d)+1))<=1
+mNQ.eDiag1 = Constraint(mNQ.d1, rule=eDiag_rule1, doc='one queen per diagonal')
+
+def eDiag_rule2(mNQ,d):
+    return sum(mNQ.vX[i,d-i] for i in range(max(1,d-N),min(N,d-1)+1))<=1
+mNQ.eDiag2 = Constraint(mNQ.d2, rule=eDiag_rule2, doc='one queen per anti-diagonal')
 
 # objective function
 def eObj_rule(mNQ):
@@ -89,16 +84,30 @@ mNQ.pprint()
 mNQ.vX.pprint()
 
 
+#%% validate the solution (bitboard check independent from the model)
+
+print('Valid solution: {}'.format(validate(mNQ.vX.extract_values(), N)))
+
+
 #%% plot
-for i in mNQ.i:
-    for j in mNQ.j:
-        X=mNQ.vX[i,j].value
-        if X==1:
-            plt.scatter(i,j,s=80,color='salmon')
-        else:
-            plt.scatter(i,j,s=10,color='grey')
+
+PlotDpi  = 1200  # resolution of the png file
+Headless = False # True -> no window (Agg backend), the plot is only saved in the file
+
+if Headless:
+    plt.switch_backend('Agg')
+
+# values of the variables as a board (one pass over the variables)
+board  = np.fromiter((mNQ.vX[i,j].value or 0 for i in mNQ.i for j in mNQ.j), dtype=float, count=N*N).reshape(N,N)
+queens = board > 0.5
+rr, cc = np.meshgrid(I, I, indexing='ij')
+
+# one collection for the empty cells and one for the queens (marker size reduced for large boards)
+scale = min(1, 8/N)**2
+plt.scatter(rr[~queens], cc[~queens], s=10*scale, color='grey'  )
+plt.scatter(rr[ queens], cc[ queens], s=80*scale, color='salmon')
 plt.axis('off')
-plt.savefig('n-queens.png', format='png', dpi=1200)
+plt.savefig('n-queens.png', format='png', dpi=PlotDpi)
 plt.show()
 
 # %%
@@ -0,0 +1,81 @@
+#%% bitboard backtracking for the N queens problem (fast path and validator of the MIP solutions)
+from concurrent.futures import ProcessPoolExecutor
+
+#%% backtracking
+
+# each board row is an integer where the bit k is the column k+1. The occupied columns and
+# diagonals are carried as bitmasks (the diagonals are shifted one position per row)
+
+def _count(full, cols, ld, rd):
+    """number of solutions from a partial placement (occupied columns and diagonals)"""
+    if cols == full:
+        return 1
+    count = 0
+    free  = full & ~(cols | ld | rd)
+    while free:
+        bit   = free & -free # lowest free column
+        free ^= bit
+        count += _count(full, cols | bit, ((ld | bit) << 1) & full, (rd | bit) >> 1)
+    return count
+
+def _count_branch(args):
+    """number of solutions with the queen of the first row in the given column (bit)"""
+    N, bit = args
+    full = (1 << N) - 1
+    return _count(full, bit, (bit << 1) & full, bit >> 1)
+
+def count_solutions(N, processes=None):
+    """number of solutions of the N queens problem. The branches of the first row are split
+    across a process pool (processes=1 -> no pool) and only half of them are explored since
+    the other half are their mirror images"""
+    if N == 1:
+        return 1
+    branches = [(N, 1 << c) for c in range(N // 2)]
+    middle   = [(N, 1 << (N // 2))] if N % 2 == 1 else []
+    if processes == 1:
+        counts = list(map(_count_branch, branches + middle))
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            counts = list(pool.map(_count_branch, branches + middle))
+    return 2*sum(counts[:len(branches)]) + sum(counts[len(branches):])
+
+def solutions(N):
+    """generator of the solutions of the N queens problem (column of the queen in each row)"""
+    full  = (1 << N) - 1
+    sol   = []
+    stack = [(0, 0, 0, full)] # occupied columns, diagonals, anti-diagonals, and free columns per row
+    while stack:
+        cols, ld, rd, free = stack[-1]
+        if not free:
+            stack.pop()
+            if sol:
+                sol.pop()
+            continue
+        bit = free & -free
+        stack[-1] = (cols, ld, rd, free ^ bit)
+        sol.append(bit.bit_length())
+        if len(sol) == N:
+            yield tuple(sol)
+            sol.pop()
+            continue
+        cols, ld, rd = cols | bit, ((ld | bit) << 1) & full, (rd | bit) >> 1
+        stack.append((cols, ld, rd, full & ~(cols | ld | rd)))
+
+#%% validator
+
+def validate(X, N):
+    """True if X (values of vX indexed by (i,j) as in the pyomo model) places N non-attacking queens"""
+    queens = [(i, j) for (i, j), x in X.items() if x is not None and x > 0.5]
+    if len(queens) != N:
+        return False
+    cols = ld = rd = 0
+    for i, j in sorted(queens):
+        bit = 1 << (j - 1)
+        d1  = 1 << (i - j + N - 1) # diagonal      (i-j)
+        d2  = 1 << (i + j - 2)     # anti-diagonal (i+j)
+        if cols & bit or ld & d1 or rd & d2:
+            return False
+        cols, ld, rd = cols | bit, ld | d1, rd | d2
+    return len({i for i, j in queens}) == N
+
+# %%
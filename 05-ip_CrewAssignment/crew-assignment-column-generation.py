@@ -0,0 +1,110 @@
+#%% crew assignment in pyomo (column generation over the flight connection network)
+import os
+import time # count clock time
+import numpy as np
+from pyomo.opt import SolverFactory
+
+import pandas as pd
+
+from crew_tools import load_crew_data, leg_costs, crew_column_generation
+
+#%% read input data
+input_data_folder = 'input-data'
+
+CrewData = load_crew_data(input_data_folder, 'crew-cache') # same loader (and cache) as crew-assignment.py
+
+# optional timing data (Flight, Departure, Arrival in hours). Without it the connections only depend on the cities.
+# The sample flight-times.csv and flight-costs.csv of input-data are a day of the example network
+TimesFile = os.path.join(input_data_folder, 'flight-times.csv')
+
+# leg costs (Flight, Cost) to price new sequences. Without them only the known sequences are used, unless the
+# leg costs are estimated from the known sequence costs (the results are then an estimate, not a bound)
+LegCostFile      = os.path.join(input_data_folder, 'flight-costs.csv')
+EstimateLegCosts = False
+
+CrewReq       = 3               # crew requierement
+Base          = 'San Francisco' # every sequence starts and ends at the base
+MaxLegs       = 7               # maximum number of flights in a sequence (the known sequences have up to 5)
+MinConnection = 0.5             # minimum time between two flights of a sequence (h), only with timing data
+MaxDuty       = 12              # maximum time from the first departure to the last arrival (h), only with timing data
+
+#%% starting sequences
+# the known sequences (flights in their order) are the starting columns
+
+I = CrewData['flights'].tolist()
+
+# flights of each sequence (column of the coverage matrix) sorted by their order
+Coverage  = CrewData['coverage'].tocsc()
+Sequences = {}
+for n,j in enumerate(CrewData['sequences'].tolist()):
+    rows, order  = Coverage.indices[Coverage.indptr[n]:Coverage.indptr[n+1]], Coverage.data[Coverage.indptr[n]:Coverage.indptr[n+1]]
+    Sequences[j] = tuple(CrewData['flights'][rows[np.argsort(order)]].tolist())
+Cost = {Sequences[j]: c for j,c in zip(CrewData['sequences'].tolist(), CrewData['cost'].tolist())}
+
+if os.path.exists(TimesFile):
+    df_times = pd.read_csv(TimesFile, index_col=0)
+    Times    = dict(zip(df_times.index, zip(df_times['Departure'], df_times['Arrival'])))
+else:
+    Times, MinConnection, MaxDuty = None, 0, None
+
+if os.path.exists(LegCostFile):
+    df_leg_cost = pd.read_csv(LegCostFile, index_col=0)
+    LegCost, Estimated = dict(zip(df_leg_cost.index, df_leg_cost['Cost'])), False
+elif EstimateLegCosts:
+    LegCost, Estimated = leg_costs(list(Cost), Cost, I), True
+else:
+    LegCost, Estimated = None, False
+
+#%% solver definition
+
+# CBC (lp master with duals and integer master)
+SolverName     = 'cbc'
+SolverPath_exe = 'C:\\cbc-win64\\cbc'
+Solver = SolverFactory(SolverName,executable=SolverPath_exe)
+
+# GUROBI (pip install gurobipy)
+#SolverName     = 'gurobi'
+#Solver = SolverFactory(SolverName)
+
+#%% column generation
+
+StartTime = time.time()
+
+Results = crew_column_generation(list(Cost), Cost, I, CrewReq, Base, Solver, MaxLegs, LegCost, Estimated, Times, MinConnection, MaxDuty)
+
+SolvingTime = time.time() - StartTime
+print('Total solving time... ', round(SolvingTime,2), 's')
+
+#%% print solution
+
+for it in Results['iterations']:
+    print('Iteration {iteration}: lp cost {lp cost:.2f}, artificial {artificial:.2f}, {sequences} sequences, {new} new, {time:.2f} s'.format(**it))
+
+if LegCost is None:
+    print("no leg costs ({}): only the known sequences are used".format(LegCostFile))
+print("generated sequences: {}, lp cost of the known sequences: {:.2f}".format(len(Results['sequences'])-len(Cost), Results['iterations'][0]['lp cost']))
+if not Results['feasible']:
+    print("the sequences can not cover every flight with the crew requirement")
+elif Results['estimated']:
+    print("estimated lp value: {:.2f} (estimated leg costs, not a bound)".format(Results['lp value']))
+    print("estimated total cost: {:.2f}".format(Results['total cost']))
+else:
+    if Results['lp bound'] is not None:
+        print("lp bound: {:.2f}".format(Results['lp bound']))
+    elif Results['lp value'] is not None:
+        print("lp value (not a bound): {:.2f}".format(Results['lp value']))
+    print("total cost: {:.2f}".format(Results['total cost']))
+
+Names = {s: j for j,s in Sequences.items()}
+for s in Results['selected']:
+    print("{:>6} ({:.2f}): {}".format(Names.get(s,'new'), Results['cost'][s], ' > '.join(s)))
+
+#%% check with the sample data (input-data): the pricing finds longer sequences than the known ones that lower the lp bound
+
+SampleCheck = True
+
+if SampleCheck:
+    assert len(Results['sequences']) > len(Cost), 'no sequence generated with the sample data'
+    assert Results['lp bound'] is not None and Results['lp bound'] < Results['iterations'][0]['lp cost']-1e-6, 'the lp bound of the sample data does not improve'
+
+# %%
@@ -1,27 +1,59 @@
 #%% generic example in pyomo
-from pyomo.environ import ConcreteModel, Set, Param, Var, Binary, Constraint, Objective, minimize, Suffix
+from pyomo.environ import ConcreteModel, Set, Param, Var, Binary, Constraint, Objective, minimize, Suffix, value
 from pyomo.opt import SolverFactory
 
-import pandas as pd
+import time # count clock time
 
 import matplotlib.pyplot as plt
 
+from crew_tools import load_crew_data, crew_pairs, presolve, original_solution
+
 #%% read input data
 input_data_folder = 'input-data'
 
-df_seq_cost        = pd.read_csv('.\\'+input_data_folder+'\\sequence-cost.csv', index_col=[0])
-df_flight_seq_data = pd.read_csv('.\\'+input_data_folder+'\\feasible-flight-sequences.csv', index_col=[0,1])
+# the csv files are read in chunks into integer coded arrays, cached in CacheFolder (None -> no cache) and
+# memory mapped on later runs while the csv files do not change
+CacheFolder = 'crew-cache'
+ChunkSize   = 100000 # rows of the csv files read at once
+
+StartTime = time.time()
+CrewData  = load_crew_data(input_data_folder, CacheFolder, ChunkSize)
+print('Loading time... ', round(time.time()-StartTime,3), 's', '(cache)' if CrewData['cached'] else '(csv)', CrewData['coverage'].shape, CrewData['coverage'].nnz, 'pairs')
 
 #%%
 
-I = list(df_flight_seq_data.reset_index()['Flight'].unique())
-J = list(df_flight_seq_data.reset_index()['Sequence'].unique())
+I = CrewData['flights'  ].tolist()
+J = CrewData['sequences'].tolist()
 
-Cj = dict(zip(df_seq_cost.index,df_seq_cost['Cost']))
-Sij= dict(zip(df_flight_seq_data.index,df_flight_seq_data['Value']))
+IJ, Order = crew_pairs(CrewData) # flight-sequence pairs (only the ones in feasible-flight-sequences.csv)
+
+Cj = dict(zip(J,CrewData['cost'].tolist()))
+Sij= dict(zip(IJ,Order))
 
 CrewReq = 3 # crew requierement
 
+#%% presolve (reduction of the covering structure before building the model)
+
+Presolve = True
+
+if Presolve:
+    Presolved = presolve(IJ, Cj, CrewReq)
+    if not Presolved['feasible']:
+        raise ValueError('the crew assignment problem is infeasible (detected in the presolve)')
+    for k,(before,after) in Presolved['size'].items():
+        print('Presolve - {}: {} -> {}'.format(k, before, after))
+    print('Presolve - fixed sequences: {}, reduction: {:.1%}, time: {:.3f} s'.format(Presolved['fixed'], Presolved['reduction'], Presolved['time']))
+
+    I, J, IJ = Presolved['flights'], Presolved['sequences'], Presolved['pairs']
+    Cj = {j: Cj[j] for j in J}
+    Sij= {ij: Sij[ij] for ij in IJ}
+    CrewReq = Presolved['CrewReq']
+
+# sequences that cover each flight (inverted index)
+Ji = {i: [] for i in I}
+for i,j in IJ:
+    Ji[i].append(j)
+
 #%% definitions
 
 # model
@@ -30,10 +62,11 @@ mCrew = ConcreteModel(name='Crew Assignment')
 # sets
 mCrew.i = Set(initialize=I, doc='flights')
 mCrew.j = Set(initialize=J, doc='sequence')
+mCrew.ij= Set(initialize=IJ, within=mCrew.i*mCrew.j, doc='flight-sequence pairs')
 
 # parameters
 mCrew.pC = Param(mCrew.j,         initialize=Cj , doc='customers demand')
-mCrew.pS = Param(mCrew.i,mCrew.j, initialize=Sij, doc='order of i in sequence j',default=0) #default=0 because not all the combinations are in Sij, so the ones not there are zero
+mCrew.pS = Param(mCrew.ij,        initialize=Sij, doc='order of i in sequence j') # only the pairs of the csv (the flight is not in the other sequences)
 
 mCrew.pR = Param(initialize=CrewReq,doc='crew requierement')
 
@@ -42,10 +75,12 @@ mCrew.vX = Var(mCrew.j, within=Binary, doc='1 if we select sequence j')
 
 # constraints
 def eAssignation(mCrew,i):
-    return sum(mCrew.vX[j] for j in mCrew.j if mCrew.pS[i,j]>0) >= 1
+    return sum(mCrew.vX[j] for j in Ji[i]) >= 1
 mCrew.eAssignation = Constraint(mCrew.i,rule=eAssignation,doc='each flight i has to be selected at least once')
 
 def eMinCrew(mCrew):
+    if not mCrew.j: # every sequence fixed or removed in the presolve
+        return Constraint.Feasible if mCrew.pR == 0 else Constraint.Infeasible
     return sum(mCrew.vX[j] for j in mCrew.j) == mCrew.pR
 mCrew.eMinCrew = Constraint(rule=eMinCrew,doc='min flights')
 
@@ -77,7 +112,10 @@ Solver = SolverFactory(SolverName,executable=SolverPath_exe)
 mCrew.write('crew.lp', io_options={'symbolic_solver_labels': True})
 
 # solve
+StartTime = time.time()
 SolverResults = Solver.solve(mCrew, tee=True)
+SolvingTime = time.time() - StartTime
+print('Total solving time... ', round(SolvingTime,3), 's', '(presolve {:.3f} s)'.format(Presolved['time']) if Presolve else '')
 
 #%% print solution
 
@@ -88,5 +126,8 @@ mCrew.pprint()
 
 mCrew.vX.pprint()
 
+# solution of the original problem (fixed sequences in the presolve and selected ones)
+if Presolve:
+    print('selected sequences: {}, cost: {}'.format(original_solution(Presolved, [j for j in mCrew.j if mCrew.vX[j].value > 0.5]), value(mCrew.ObjFun)+Presolved['fixed cost']))
 
 # %%
@@ -0,0 +1,355 @@
+#%% helper functions for the crew assignment example (data loading, set covering presolve and column generation)
+import os
+import numpy as np
+import pandas as pd
+import time # count clock time
+from pyomo.environ import ConcreteModel, Set, Var, NonNegativeReals, Binary, Constraint, Objective, minimize, Suffix, value
+from scipy.sparse import csr_array
+
+# the covering structure is given by the flight-sequence pairs (i,j): the flight i is in the sequence j.
+# The flights and the sequences are coded as integers and the coverage sets are packed bitsets
+
+#%% data loading
+
+# the csv files are read in chunks and the flight and sequence names are coded as integers (order of appearance).
+# The compact arrays (names, costs and the csr coverage matrix flights x sequences with the order of each flight)
+# are saved as .npy files in a cache folder, which are memory mapped on later runs while the csv files do not change
+
+_CACHE_ARRAYS = ('flights', 'sequences', 'cost', 'indptr', 'indices', 'order', 'source')
+
+def _codes(names, known):
+    """integer codes of names, adding the new ones to known (name -> code)"""
+    for name in names.unique():
+        known.setdefault(name, len(known))
+    return names.map(known).to_numpy(np.int32)
+
+def _source(files):
+    """size and modification time of the csv files (the cache is valid while they are the same)"""
+    return np.array([[os.stat(f).st_size, os.stat(f).st_mtime_ns] for f in files], dtype=np.int64)
+
+def load_crew_data(input_data_folder, CacheFolder=None, ChunkSize=100000):
+    """flights, sequences, cost per sequence and coverage matrix (csr, flights x sequences, order of the flight in
+    the sequence) from sequence-cost.csv and feasible-flight-sequences.csv"""
+    files = [os.path.join(input_data_folder, 'sequence-cost.csv'), os.path.join(input_data_folder, 'feasible-flight-sequences.csv')]
+    if CacheFolder is not None and all(os.path.exists(os.path.join(CacheFolder, k+'.npy')) for k in _CACHE_ARRAYS):
+        cache = {k: np.load(os.path.join(CacheFolder, k+'.npy'), mmap_mode='r') for k in _CACHE_ARRAYS}
+        if np.array_equal(cache['source'], _source(files)):
+            return {'flights'  : cache['flights'],
+                    'sequences': cache['sequences'],
+                    'cost'     : cache['cost'],
+                    'coverage' : csr_array((cache['order'], cache['indices'], cache['indptr']), shape=(len(cache['flights']), len(cache['sequences']))),
+                    'cached'   : True}
+
+    seq_code, cost = {}, []
+    for chunk in pd.read_csv(files[0], chunksize=ChunkSize, dtype={'Sequence': str}):
+        _codes(chunk['Sequence'], seq_code)
+        cost.append(chunk['Cost'].to_numpy(np.float64))
+    if len(seq_code) != sum(len(c) for c in cost):
+        raise ValueError('repeated sequences in '+files[0])
+
+    flight_code, rows, cols, order = {}, [], [], []
+    nS = len(seq_code)
+    for chunk in pd.read_csv(files[1], chunksize=ChunkSize, dtype={'Flight': str, 'Sequence': str}):
+        rows .append(_codes(chunk['Flight'], flight_code))
+        cols .append(_codes(chunk['Sequence'], seq_code))
+        order.append(chunk['Value'].to_numpy(np.int16))
+    if len(seq_code) != nS:
+        raise ValueError('sequences without cost in '+files[1])
+
+    flights   = np.array(list(flight_code), dtype=str)
+    sequences = np.array(list(seq_code), dtype=str)
+    coverage  = csr_array((np.concatenate(order), (np.concatenate(rows), np.concatenate(cols))), shape=(len(flights), len(sequences)))
+    coverage.sort_indices()
+    data = {'flights'  : flights,
+            'sequences': sequences,
+            'cost'     : np.concatenate(cost),
+            'coverage' : coverage,
+            'cached'   : False}
+
+    if CacheFolder is not None:
+        os.makedirs(CacheFolder, exist_ok=True)
+        arrays = {'flights': flights, 'sequences': sequences, 'cost': data['cost'], 'indptr': coverage.indptr,
+                  'indices': coverage.indices, 'order': coverage.data, 'source': _source(files)}
+        for k in _CACHE_ARRAYS:
+            np.save(os.path.join(CacheFolder, k+'.npy'), arrays[k])
+    return data
+
+def crew_pairs(data):
+    """flight-sequence pairs (names) and their order of the coverage matrix"""
+    A = data['coverage']
+    rows = np.repeat(np.arange(A.shape[0]), np.diff(A.indptr))
+    return list(zip(data['flights'][rows].tolist(), data['sequences'][A.indices].tolist())), A.data.tolist()
+
+#%% bitsets
+
+def _bitsets(rows, cols, nrows, ncols):
+    """packed bitsets (one row of bytes per rows index with the bits of its cols indices)"""
+    B = np.zeros((nrows, (ncols+7)//8), dtype=np.uint8)
+    np.bitwise_or.at(B, (rows, cols//8), (128 >> (cols % 8)).astype(np.uint8))
+    return B
+
+def _groups(rows, cols, nrows):
+    """cols of each rows index (csr): cols[start[r]:start[r+1]]"""
+    order = np.argsort(rows, kind='stable')
+    start = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=nrows))])
+    return cols[order], start
+
+#%% presolve
+
+def presolve(pairs, cost, CrewReq=None):
+    """reduction of the set covering problem (every flight covered by a selected sequence) before building the model:
+    - a sequence that is the only cover of a flight is fixed (selected) and its flights are removed
+    - a flight is removed if its sequences contain the sequences of another flight (covering the other one covers it)
+    - a sequence is removed if other sequences cover its flights at a lower cost (ties by more flights and then order).
+      With the cardinality constraint (exactly CrewReq sequences) CrewReq dominating sequences are needed, so at least
+      one of them is not selected and it can replace the removed one (one is enough if CrewReq is None)
+    It returns the reduced pairs, flights and sequences, the fixed sequences and the remaining crew requirement"""
+    StartTime = time.time()
+    flights   = list(dict.fromkeys(i for i,j in pairs))
+    sequences = list(cost)
+    fcode = {i: n for n,i in enumerate(flights  )}
+    scode = {j: n for n,j in enumerate(sequences)}
+    pf = np.fromiter((fcode[i] for i,j in pairs), dtype=np.int64, count=len(pairs))
+    ps = np.fromiter((scode[j] for i,j in pairs), dtype=np.int64, count=len(pairs))
+    c  = np.array([cost[j] for j in sequences], dtype=float)
+    nF, nS = len(flights), len(sequences)
+
+    af, aS   = np.ones(nF, dtype=bool), np.ones(nS, dtype=bool) # active flights and sequences
+    fixed    = []
+    R        = CrewReq
+    feasible = True
+    changed  = True
+    while changed and feasible:
+        changed = False
+        keep = af[pf] & aS[ps]
+        f, s = pf[keep], ps[keep]
+        count = np.bincount(f, minlength=nF)
+        if (af & (count == 0)).any() or (R is not None and R < 0):
+            feasible = False
+            break
+
+        # fixing: sequences that are the only cover of a flight
+        only = af & (count == 1)
+        if only.any():
+            fix = np.unique(s[only[f]])
+            fixed.extend(fix.tolist())
+            af[np.unique(f[np.isin(s, fix)])] = False
+            aS[fix] = False
+            R = None if R is None else R-len(fix)
+            changed = True
+            continue
+
+        # row dominance: flight i removed if the sequences of another flight are a subset of its sequences
+        Bf = _bitsets(f, s, nF, nS)
+        seqs, sstart = _groups(f, s, nF)
+        flis, fstart = _groups(s, f, nS)
+        for i in np.flatnonzero(af):
+            cand = np.unique(np.concatenate([flis[fstart[j]:fstart[j+1]] for j in seqs[sstart[i]:sstart[i+1]]]))
+            cand = cand[af[cand] & (cand != i)]
+            sub  = cand[((Bf[cand] & Bf[i]) == Bf[cand]).all(axis=1)]
+            # a strict subset, or the same set of a flight with a lower index
+            if (count[sub] < count[i]).any() or (sub < i).any():
+                af[i]   = False
+                changed = True
+
+        # column dominance: sequence j removed if enough cheaper sequences cover its flights
+        keep = af[pf] & aS[ps]
+        f, s = pf[keep], ps[keep]
+        count = np.bincount(f, minlength=nF)
+        size  = np.bincount(s, minlength=nS)
+        Bs = _bitsets(s, f, nS, nF)
+        seqs, sstart = _groups(f, s, nF)
+        flis, fstart = _groups(s, f, nS)
+        rank = np.empty(nS, dtype=np.int64)
+        rank[np.lexsort((np.arange(nS), -size, c))] = np.arange(nS) # cost, more flights and order
+        need = 1 if R is None else R
+        for j in np.argsort(-rank):
+            if not aS[j]:
+                continue
+            fl = flis[fstart[j]:fstart[j+1]]
+            if len(fl):
+                r    = fl[count[fl].argmin()] # its least covered flight (every dominating sequence covers it)
+                cand = seqs[sstart[r]:sstart[r+1]]
+            else:
+                cand = np.flatnonzero(aS)
+            cand = cand[aS[cand] & (rank[cand] < rank[j])]
+            if ((Bs[cand] & Bs[j]) == Bs[j]).all(axis=1).sum() >= need:
+                aS[j]   = False
+                changed = True
+
+    keep = af[pf] & aS[ps]
+    return {'pairs'     : [pairs[n] for n in np.flatnonzero(keep)],
+            'flights'   : [flights  [n] for n in np.flatnonzero(af)],
+            'sequences' : [sequences[n] for n in np.flatnonzero(aS)],
+            'fixed'     : [sequences[n] for n in fixed],
+            'fixed cost': float(c[fixed].sum()),
+            'CrewReq'   : R,
+            'feasible'  : feasible,
+            'size'      : {'flights': (nF, int(af.sum())), 'sequences': (nS, int(aS.sum())), 'pairs': (len(pairs), int(keep.sum()))},
+            'reduction' : 1-keep.sum()/max(len(pairs), 1),
+            'time'      : time.time()-StartTime}
+
+def original_solution(presolved, selected):
+    """sequences of the original problem: the fixed ones and the ones selected in the reduced problem"""
+    return presolved['fixed'] + [j for j in selected if j not in presolved['fixed']]
+
+#%% column generation over flight sequences
+
+# a flight is named 'Origin - Destination' and a sequence is a tuple of flights that starts and ends at the base.
+# Optional timing data (departure and arrival of each flight, in hours) restricts the connections and the duty
+
+EPS = 1e-6
+
+def connection_graph(flights, Base, times=None, MinConnection=0):
+    """flights that can follow each flight (the destination of one is the origin of the next, with enough connection
+    time if there is timing data), flights that leave the base and flights that return to it"""
+    origin = {f: f.split(' - ')[0] for f in flights}
+    dest   = {f: f.split(' - ')[1] for f in flights}
+    succ   = {f: [g for g in flights if g != f and origin[g] == dest[f] and dest[f] != Base and
+                  (times is None or times[g][0] >= times[f][1]+MinConnection)] for f in flights}
+    return {'succ' : succ,
+            'start': [f for f in flights if origin[f] == Base],
+            'end'  : {f for f in flights if dest  [f] == Base}}
+
+def leg_costs(sequences, cost, flights):
+    """estimated cost of each flight such that the cost of a sequence is the sum of its flights (least squares
+    fit of the known sequence costs, non negative). It is only an estimate: the costs of the new sequences and
+    the lp value obtained with it are not the real ones"""
+    A = np.array([[s.count(f) for f in flights] for s in sequences], dtype=float)
+    x = np.linalg.lstsq(A, np.array([cost[s] for s in sequences], dtype=float), rcond=None)[0]
+    return dict(zip(flights, np.maximum(x, 0)))
+
+def crew_master_model(sequences, cost, flights, CrewReq, BigM, integer=False):
+    """master problem: sequences selected to cover every flight with the crew requirement. Artificial variables
+    (cost BigM) cover the flights and the crew requirement that the sequences can not, so the master is always
+    feasible and column generation can start from any set of sequences"""
+    mm = ConcreteModel('Crew Assignment (master)')
+
+    mm.i = Set(initialize=flights                , doc='flights')
+    mm.j = Set(initialize=range(len(sequences))  , doc='sequences')
+
+    mm.vX = Var(mm.j, within=Binary if integer else NonNegativeReals, doc='1 if we select sequence j')
+    mm.vA = Var(mm.i, within=NonNegativeReals, doc='artificial cover of flight i')
+    mm.vR = Var(      within=NonNegativeReals, doc='artificial crew requirement')
+
+    Ji = {i: [] for i in flights}
+    for j,seq in enumerate(sequences):
+        for i in seq:
+            Ji[i].append(j)
+    mm.eAssignation = Constraint(mm.i, rule=lambda mm,i: sum(mm.vX[j] for j in Ji[i]) + mm.vA[i] >= 1, doc='each flight i has to be selected at least once')
+    mm.eMinCrew     = Constraint(expr=sum(mm.vX[j] for j in mm.j) + mm.vR == CrewReq, doc='min flights')
+
+    mm.ObjFun = Objective(expr=sum(cost[j]*mm.vX[j] for j in mm.j) + BigM*(sum(mm.vA[i] for i in mm.i) + mm.vR), sense=minimize, doc='total cost')
+
+    # duals of the flights and of the crew requirement (only in the lp relaxation)
+    if not integer:
+        mm.dual = Suffix(direction=Suffix.IMPORT)
+    return mm
+
+def artificial(mm):
+    """cover given by the artificial variables of a solved master (0 if the sequences are feasible)"""
+    return sum(mm.vA[i].value for i in mm.i) + mm.vR.value
+
+def _dominates(a, b):
+    """label a dominates label b (both at the same last flight)"""
+    return a[0] <= b[0]+EPS and a[2] & b[2] == a[2] and len(a[1]) <= len(b[1]) and a[3] >= b[3]
+
+def price_sequences(reduced, mu, graph, MaxLegs, times=None, MaxDuty=None):
+    """resource constrained shortest path from the base to the base with the reduced cost of each flight:
+    labels (cost, last flight, visited flights, start time) are extended along the connections while the legs
+    (and the duty time) allow it, and a label is dropped if another one at the same flight has lower cost,
+    a subset of its flights and a later start. It returns the sequences with negative reduced cost (their cost minus
+    mu, the dual of the crew requirement), the best first"""
+    index  = {f: n for n,f in enumerate(graph['succ'])}
+    labels = {f: [] for f in graph['succ']}
+    queue  = []
+    for f in graph['start']:
+        label = (reduced[f], (f,), 1 << index[f], times[f][0] if times is not None else 0)
+        labels[f].append(label)
+        queue.append(label)
+
+    done = []
+    while queue:
+        cost, path, visited, start = queue.pop()
+        last = path[-1]
+        if (cost, path, visited, start) not in labels[last]: # dominated after it was queued
+            continue
+        if last in graph['end']:
+            done.append((cost, path))
+            continue
+        if len(path) == MaxLegs:
+            continue
+        for g in graph['succ'][last]:
+            if visited >> index[g] & 1 or (MaxDuty is not None and times[g][1]-start > MaxDuty):
+                continue
+            label = (cost+reduced[g], path+(g,), visited | 1 << index[g], start)
+            if any(_dominates(other, label) for other in labels[g]):
+                continue
+            labels[g] = [other for other in labels[g] if not _dominates(label, other)] + [label]
+            queue.append(label)
+
+    return sorted((c-mu,p) for c,p in done if c-mu < -EPS)
+
+def crew_column_generation(sequences, cost, flights, CrewReq, Base, Solver, MaxLegs, legcost=None, estimated=False, times=None, MinConnection=0, MaxDuty=None, MaxIter=100, NumColumns=5, BigM=None):
+    """column generation: the lp master is solved over the current sequences and new sequences are priced with the
+    duals of the flights and of the crew requirement over the connection graph until no sequence has a negative reduced
+    cost (at most NumColumns new sequences per iteration). The cost of a new sequence is the sum of its leg costs
+    (legcost), without them no sequence is priced and only the given ones are used. Then the master is solved with
+    binary variables over the generated sequences.
+    The lp value is a lower bound only if it converged with real leg costs (not estimated) and without artificials"""
+    sequences  = list(sequences)
+    cost       = dict(cost)
+    graph      = connection_graph(flights, Base, times, MinConnection)
+    iterations = []
+    converged  = False
+
+    # the artificial cost is far above the cost of any selection of CrewReq sequences (given or priced)
+    if BigM is None:
+        longest = MaxLegs*max(legcost.values(), default=0) if legcost is not None else 0
+        BigM    = 1 + CrewReq*max(max(cost.values(), default=0), longest)*len(flights)
+
+    for it in range(MaxIter):
+        StartTime = time.time()
+
+        mm = crew_master_model(sequences, [cost[s] for s in sequences], flights, CrewReq, BigM)
+        Solver.solve(mm)
+
+        new = []
+        if legcost is not None:
+            duals = {i: mm.dual[mm.eAssignation[i]] for i in flights}
+            mu    = mm.dual[mm.eMinCrew]
+            # reduced cost of a sequence: sum of the leg costs minus the duals of its flights (and minus the crew requirement dual)
+            reduced = {f: legcost[f]-duals[f] for f in flights}
+            new     = [p for c,p in price_sequences(reduced, mu, graph, MaxLegs, times, MaxDuty) if p not in cost][:NumColumns]
+
+        iterations.append({'iteration': it+1, 'lp cost': value(mm.ObjFun), 'artificial': artificial(mm), 'sequences': len(sequences), 'new': len(new), 'time': time.time()-StartTime})
+        if not new:
+            converged = legcost is not None
+            break
+        for p in new:
+            sequences.append(p)
+            cost[p] = sum(legcost[f] for f in p)
+
+    LPValue    = value(mm.ObjFun)
+    LPFeasible = artificial(mm) <= EPS
+
+    # integer master over the generated sequences
+    StartTime = time.time()
+    mm = crew_master_model(sequences, [cost[s] for s in sequences], flights, CrewReq, BigM, integer=True)
+    Solver.solve(mm)
+    IntegerTime = time.time()-StartTime
+
+    selected = [sequences[j] for j in mm.j if mm.vX[j].value > 0.5]
+    return {'sequences'   : sequences,
+            'cost'        : cost,
+            'selected'    : selected,
+            'feasible'    : artificial(mm) <= EPS,
+            'total cost'  : sum(cost[s] for s in selected),
+            'lp value'    : LPValue if LPFeasible else None,
+            'lp bound'    : LPValue if LPFeasible and converged and not estimated else None,
+            'estimated'   : estimated,
+            'converged'   : converged,
+            'iterations'  : iterations,
+            'integer time': IntegerTime}
+
+# %%
@@ -0,0 +1,126 @@
+#%% helper functions shared by the self-driving cars examples
+import numpy as np
+from functools import lru_cache
+
+#%% distances
+
+@lru_cache(maxsize=None)
+def distance_matrix(rows, cols, nodes):
+    """euclidean distance among the nodes (cells) used in the trip.
+    Only the nodes actually used are computed (not the whole board) and the
+    result is cached per board geometry (rows, cols and nodes as tuples)"""
+    row_pos = {i:r for r,i in enumerate(rows)}
+    col_pos = {j:c for c,j in enumerate(cols)}
+    r = np.array([row_pos[i] for (i,j) in nodes], dtype=float)
+    c = np.array([col_pos[j] for (i,j) in nodes], dtype=float)
+    D = np.hypot(r[:,None]-r[None,:], c[:,None]-c[None,:])
+    D.setflags(write=False) # cached, so it must not be modified
+    return D
+
+#%% heuristic tour (nearest neighbor + 2-opt/or-opt)
+
+def _improve_path(P, C, first, last):
+    """2-opt and or-opt moves (first improvement) on the path P between the positions first and last.
+    The positions outside [first,last] are fixed and C is the cost matrix (list of lists)"""
+    improved = True
+    while improved:
+        improved = False
+        # 2-opt: reverse the segment P[i..j] (the cost matrix is not symmetric)
+        for i in range(first, last):
+            fwd = rev = 0
+            for j in range(i+1, last+1):
+                fwd += C[P[j-1]][P[j]]
+                rev += C[P[j]][P[j-1]]
+                delta = (C[P[i-1]][P[j]] + C[P[i]][P[j+1]] - C[P[i-1]][P[i]] - C[P[j]][P[j+1]]
+                         + rev - fwd)
+                if delta < -1e-9:
+                    P[i:j+1] = P[i:j+1][::-1]
+                    improved = True
+                    break
+            if improved:
+                break
+        if improved:
+            continue
+        # or-opt: move the segment P[i..i+L-1] between P[k] and P[k+1]
+        for L in (1, 2, 3):
+            for i in range(first, last-L+2):
+                e = i+L-1
+                remove = C[P[i-1]][P[e+1]] - C[P[i-1]][P[i]] - C[P[e]][P[e+1]]
+                for k in range(first-1, last+1):
+                    if i-1 <= k <= e:
+                        continue
+                    delta = remove + C[P[k]][P[i]] + C[P[e]][P[k+1]] - C[P[k]][P[k+1]]
+                    if delta < -1e-9:
+                        segment = P[i:e+1]
+                        rest    = P[:i] + P[e+1:]
+                        k       = k if k < i else k-L
+                        P[:]    = rest[:k+1] + segment + rest[k+1:]
+                        improved = True
+                        break
+                if improved:
+                    break
+            if improved:
+                break
+    return P
+
+def heuristic_tour(nodes, D, PeopleToBuilding, closed=False):
+    """feasible tour built with nearest neighbor and improved with 2-opt/or-opt.
+    Each person is picked up and dropped off right after (pickup -> dropoff precedence),
+    so the tour is a sequence of people and the cost between two people is the distance
+    from the dropoff of the first one to the pickup of the second one.
+    It returns the arcs of the tour in order (one per stage), its distance, and a lower bound of the optimal distance.
+    A dropoff in the cell of the next pickup gives a self-loop arc (zero distance), so the stages of the tour
+    match the stages of the model, which keeps the self-loops"""
+    pos     = {n:p for p,n in enumerate(nodes)}
+    pickup  = np.array([pos[i,j]   for (i,j,ii,jj) in PeopleToBuilding])
+    dropoff = np.array([pos[ii,jj] for (i,j,ii,jj) in PeopleToBuilding])
+    P       = len(pickup)
+    ride    = float(D[pickup,dropoff].sum())
+
+    # cost from the dropoff of person a to the pickup of person b (P is a dummy start/end)
+    C = np.zeros((P+1,P+1))
+    C[:P,:P] = D[dropoff[:,None],pickup[None,:]]
+    np.fill_diagonal(C, np.inf)
+    C[P,P] = 0
+    if closed and P == 1: # the only person is also the next one (back to the start)
+        C[0,0] = D[dropoff[0],pickup[0]]
+
+    # nearest neighbor from each possible start
+    best = None
+    for start in (range(P) if not closed else [0]):
+        seq, free = [start], np.ones(P, dtype=bool)
+        free[start] = False
+        for t in range(P-1):
+            nxt = int(np.argmin(np.where(free, C[seq[-1],:P], np.inf)))
+            seq.append(nxt)
+            free[nxt] = False
+        cost = C[seq[:-1],seq[1:]].sum() + (C[seq[-1],seq[0]] if closed else 0)
+        if best is None or cost < best[0]:
+            best = (cost, seq)
+
+    # improvement with fixed endpoints: the dummy (open tour) or the first person (closed tour)
+    Cl = C.tolist()
+    if closed:
+        path = _improve_path(best[1] + [best[1][0]], Cl, 1, P-1)[:-1]
+    else:
+        path = _improve_path([P] + best[1] + [P], Cl, 1, P)[1:-1]
+
+    # arcs of the tour in order
+    seq  = path + ([path[0]] if closed else [])
+    tour = []
+    for t,a in enumerate(path):
+        tour.append(nodes[pickup[a]] + nodes[dropoff[a]])
+        if t+1 < len(seq):
+            tour.append(nodes[dropoff[a]] + nodes[pickup[seq[t+1]]])
+    distance = ride + float(sum(C[a,b] for a,b in zip(seq[:-1],seq[1:])))
+
+    # lower bound: every person (but the first one in the open tour) is reached from another dropoff
+    # and every person (but the last one) leaves to another pickup
+    arrive = np.sort(C[:P,:P].min(axis=0))
+    leave  = np.sort(C[:P,:P].min(axis=1))
+    used   = P if closed else P-1
+    bound  = ride + max(arrive[:used].sum(), leave[:used].sum())
+
+    return tour, distance, float(bound)
+
+# %%
@@ -2,6 +2,9 @@
 from pyomo.environ import ConcreteModel, Set, Param, Var, Binary, Constraint, Objective, minimize, Suffix, value
 from pyomo.opt import SolverFactory
 import string
+import numpy as np
+
+from sdc_tools import distance_matrix, heuristic_tour
 
 #%% read input data
 
@@ -38,11 +41,30 @@ PeopleToBuilding = {
     ('J', 8,'H',  9): 1,
     }
 
-Distance = {(i,j,ii,jj):((rr-r)**2+(cc-c)**2)**(1/2)
-                for r,i   in enumerate(rows)
-                for c,j   in enumerate(cols)
-                for rr,ii in enumerate(rows)
-                for cc,jj in enumerate(cols)}
+# sparse build mode: only the cells where people are picked up or dropped off are
+# included in the trip (nodes), so the model grows with the number of people and
+# not with the board size (N^4). With SparseArcs=False the whole board is used
+SparseArcs = True
+
+if SparseArcs:
+    nodes = sorted(set(PeopleLocation) | {(ii,jj) for (i,j,ii,jj) in PeopleToBuilding})
+else:
+    nodes = [(i,j) for i in rows for j in cols]
+
+# arcs as pairs of node positions. The self-loops are kept in both modes (only one per node): with zero
+# distance they are the way to stay in a cell for a stage (a dropoff cell that is the next pickup cell)
+nFrom, nTo = np.nonzero(np.ones((len(nodes),len(nodes)), dtype=bool))
+arcs = [nodes[n]+nodes[nn] for n,nn in zip(nFrom.tolist(), nTo.tolist())]
+
+# distance between the nodes of each arc (vectorized and cached per board geometry)
+Distance = dict(zip(arcs, distance_matrix(tuple(rows), tuple(cols), tuple(nodes))[nFrom,nTo].tolist()))
+
+# arcs leaving and entering each node (to avoid scanning all the arcs in the constraints)
+ArcsOut = {n:[] for n in nodes}
+ArcsIn  = {n:[] for n in nodes}
+for (i,j,ii,jj) in arcs:
+    ArcsOut[i ,j ].append((i,j,ii,jj))
+    ArcsIn [ii,jj].append((i,j,ii,jj))
 
 # max stages in the trip 
 S = 2*len(PeopleLocation) #we want go back to the starting point 
@@ -56,64 +78,51 @@ mSDC = ConcreteModel(name='Self-driving cars')
 
 # sets
 mSDC.i  = Set(initialize=rows  , doc='rows'              )
-mSDC.ii = Set(initialize=mSDC.i, doc='alias for rows'    )
-mSDC.iii= Set(initialize=mSDC.i, doc='alias for rows'    )
 mSDC.j  = Set(initialize=cols  , doc='columns'           )
-mSDC.jj = Set(initialize=mSDC.j, doc='alias for columns' )
-mSDC.jjj= Set(initialize=mSDC.j, doc='alias for columns' )
 mSDC.k  = Set(initialize=stag  , doc='stages in the trip')
+mSDC.n  = Set(initialize=nodes , doc='cells included in the trip (nodes)', dimen=2, within=mSDC.i*mSDC.j)
+mSDC.a  = Set(initialize=arcs  , doc='paths between nodes (arcs)'        , dimen=4, within=mSDC.n*mSDC.n)
 
 # parameters
-mSDC.pPeopleLoc  = Param(mSDC.i , mSDC.j ,                   initialize=PeopleLocation  , doc='people   location in the board',default=0) #default=0 because not all the combinations are in the parameter initialization
-mSDC.pPeopToBuild= Param(mSDC.i , mSDC.j , mSDC.ii, mSDC.jj, initialize=PeopleToBuilding, doc='People to destination Building',default=0) #default=0 because not all the combinations are in the parameter initialization
-mSDC.pDistance   = Param(mSDC.i , mSDC.j , mSDC.ii, mSDC.jj, initialize=Distance        , doc='People to destination Building',default=0) #default=0 because not all the combinations are in the parameter initialization
+mSDC.pPeopleLoc  = Param(mSDC.n, initialize=PeopleLocation  , doc='people   location in the board',default=0) #default=0 because not all the combinations are in the parameter initialization
+mSDC.pPeopToBuild= Param(mSDC.a, initialize=PeopleToBuilding, doc='People to destination Building',default=0) #default=0 because not all the combinations are in the parameter initialization
+mSDC.pDistance   = Param(mSDC.a, initialize=Distance        , doc='distance between nodes'        ) #all the arcs are in the parameter initialization
 
 
 # variables
-mSDC.vX = Var(mSDC.i, mSDC.j, mSDC.ii, mSDC.jj, mSDC.k, within=Binary, doc='wheter the path from i to j is included in the route at stage k')
+mSDC.vX = Var(mSDC.a, mSDC.k, within=Binary, doc='wheter the path from i to j is included in the route at stage k')
 
 # constraints
 def ePeopToBuild_rule(mSDC,i,j):
     if(mSDC.pPeopleLoc[i,j]==1):
         return sum(mSDC.vX[i,j,ii,jj,k]
-                    for ii in mSDC.ii
-                    for jj in mSDC.jj
+                    for (i,j,ii,jj) in ArcsOut[i,j]
                     for k  in mSDC.k 
                     if mSDC.pPeopToBuild[i,j,ii,jj]==1)==1
     else:
         return Constraint.Skip
-mSDC.ePeopToBuild = Constraint(mSDC.i,mSDC.j, rule=ePeopToBuild_rule, doc='Assigning a person an only building')
+mSDC.ePeopToBuild = Constraint(mSDC.n, rule=ePeopToBuild_rule, doc='Assigning a person an only building')
 
 def eOrder_rule(mSDC,k):
-    return sum(mSDC.vX[ii,jj,i,j,k]
-                for i  in mSDC.i
-                for j  in mSDC.j
-                for ii in mSDC.ii
-                for jj in mSDC.jj)==1
+    return sum(mSDC.vX[i,j,ii,jj,k]
+                for (i,j,ii,jj) in mSDC.a)==1
 mSDC.eOrder = Constraint(mSDC.k, rule=eOrder_rule, doc='Assigning one order between the destinations')
 
 def eSequence_rule(mSDC,ii,jj,k):
     if(k != S):
         return sum(mSDC.vX[i,j,ii,jj,k]
-                    for i in mSDC.i
-                    for j in mSDC.j)==sum(mSDC.vX[ii,jj,iii,jjj,k+1]
-                                            for iii in mSDC.iii
-                                            for jjj in mSDC.jjj)
+                    for (i,j,ii,jj) in ArcsIn[ii,jj])==sum(mSDC.vX[ii,jj,iii,jjj,k+1]
+                                                           for (ii,jj,iii,jjj) in ArcsOut[ii,jj])
     else:
         return sum(mSDC.vX[i,j,ii,jj,k]
-                    for i in mSDC.i
-                    for j in mSDC.j)==sum(mSDC.vX[ii,jj,iii,jjj,1]
-                                            for iii in mSDC.iii
-                                            for jjj in mSDC.jjj)
-mSDC.eSequence = Constraint(mSDC.ii,mSDC.jj,mSDC.k, rule=eSequence_rule, doc='Sequence for the travel (only one route) -> avoiding sub-routes')
+                    for (i,j,ii,jj) in ArcsIn[ii,jj])==sum(mSDC.vX[ii,jj,iii,jjj,1]
+                                                           for (ii,jj,iii,jjj) in ArcsOut[ii,jj])
+mSDC.eSequence = Constraint(mSDC.n,mSDC.k, rule=eSequence_rule, doc='Sequence for the travel (only one route) -> avoiding sub-routes')
 
 # objective function
 def eObj_rule(mSDC):
     return sum(mSDC.pDistance[i,j,ii,jj]*mSDC.vX[i,j,ii,jj,k]
-                for i  in mSDC.i
-                for j  in mSDC.j
-                for ii in mSDC.ii
-                for jj in mSDC.jj
+                for (i,j,ii,jj) in mSDC.a
                 for k  in mSDC.k)
 mSDC.ObjFun = Objective(rule=eObj_rule, sense=minimize)
 
@@ -135,13 +144,32 @@ mSDC.ObjFun = Objective(rule=eObj_rule, sense=minimize)
 SolverName     = 'gurobi'
 Solver = SolverFactory(SolverName)
 
+#%% heuristic warm start
+
+# relative gap accepted to keep the heuristic tour without calling the solver (0 -> always solve)
+AcceptedGap = 0
+
+# feasible tour (nearest neighbor + 2-opt/or-opt) and lower bound of the total distance
+HeurTour, HeurDistance, LowerBound = heuristic_tour(nodes, distance_matrix(tuple(rows), tuple(cols), tuple(nodes)), PeopleToBuilding, closed=True)
+HeurGap = 0 if HeurDistance == 0 else (HeurDistance-LowerBound)/HeurDistance # every trip of zero length -> no gap
+print('Heuristic distance: {:.4f}, lower bound: {:.4f}, gap: {:.2%}'.format(HeurDistance, LowerBound, HeurGap))
+
+# the heuristic tour is loaded in the variables as MIP start (one arc per stage, self-loops included)
+for v in mSDC.vX.values():
+    v.value = 0
+for k,(i,j,ii,jj) in zip(mSDC.k, HeurTour):
+    mSDC.vX[i,j,ii,jj,k].value = 1
+
 #%% solving the model
 
-# write the optimization problem
-mSDC.write('self-driving-cars-closed-loop.lp', io_options={'symbolic_solver_labels': True})
+if HeurGap < AcceptedGap:
+    print('Heuristic tour accepted, the model is not solved')
+else:
+    # write the optimization problem
+    mSDC.write('self-driving-cars-closed-loop.lp', io_options={'symbolic_solver_labels': True})
 
-# solve
-SolverResults = Solver.solve(mSDC, tee=True)
+    # solve (warmstart with the heuristic tour)
+    SolverResults = Solver.solve(mSDC, tee=True, warmstart=True)
 
 #mSDC.pprint() # print solution
 #mSDC.vX.pprint() # print all the variables
@@ -154,10 +182,7 @@ print('Total distance: ' + str(value(mSDC.ObjFun)))
 # the tour
 tour = {(i,j,ii,jj):k 
             for k  in mSDC.k
-            for i  in mSDC.i
-            for j  in mSDC.j
-            for ii in mSDC.ii
-            for jj in mSDC.jj
+            for (i,j,ii,jj) in mSDC.a
             if mSDC.vX[i,j,ii,jj,k].value==1}
 tour
 
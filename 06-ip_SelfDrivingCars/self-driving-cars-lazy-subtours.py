@@ -0,0 +1,195 @@
+#%% generic example in pyomo (subtour elimination added lazily instead of the stages of the trip)
+from pyomo.environ import ConcreteModel, Set, Param, Var, Binary, Constraint, ConstraintList, Objective, minimize, value
+from pyomo.opt import SolverFactory
+import string
+import time # count clock time
+import numpy as np
+
+from sdc_tools import distance_matrix
+
+#%% read input data
+
+# inputs for sets
+N = 10 # board size
+
+rows = list(string.ascii_uppercase[0:N])
+cols = [c+1 for c in range(N)]
+
+# inputs for parameters
+PeopleLocation = {
+    ('A', 2): 1,
+    ('A', 7): 1,
+    ('B', 9): 1,
+    ('D', 5): 1,
+    ('E', 4): 1,
+    ('E', 8): 1,
+    ('G', 3): 1,
+    ('H', 4): 1,
+    ('J', 3): 1,
+    ('J', 8): 1,
+    }
+
+PeopleToBuilding = {
+    ('A', 2,'B',  5): 1,
+    ('A', 7,'D',  9): 1,
+    ('B', 9,'F',  6): 1,
+    ('D', 5,'C',  2): 1,
+    ('E', 4,'I',  7): 1,
+    ('E', 8,'D',  2): 1,
+    ('G', 3,'G',  7): 1,
+    ('H', 4,'J',  1): 1,
+    ('J', 3,'G', 10): 1,
+    ('J', 8,'H',  9): 1,
+    }
+
+# type of trip: closed (we go back to the starting point) or open
+ClosedTour = False
+
+# each visit is a node: the pickup and the dropoff of each person (people are numbered in PeopleToBuilding).
+# Two visits in the same cell (people in the same building, or a dropoff cell that is a pickup cell) are
+# different nodes at zero distance, so the trip can go through a cell more than once
+People = list(PeopleToBuilding)
+nodes  = [('Pickup',p) for p in range(1,len(People)+1)] + [('Dropoff',p) for p in range(1,len(People)+1)]
+Cell   = {**{('Pickup' ,p):(i ,j ) for p,(i,j,ii,jj) in enumerate(People,1)},
+          **{('Dropoff',p):(ii,jj) for p,(i,j,ii,jj) in enumerate(People,1)}}
+
+# arcs among the nodes (no self-loops)
+nFrom, nTo = np.nonzero(~np.eye(len(nodes), dtype=bool))
+arcs = [nodes[n]+nodes[nn] for n,nn in zip(nFrom.tolist(), nTo.tolist())]
+
+# distance between the nodes of each arc (distance between their cells)
+Distance = dict(zip(arcs, distance_matrix(tuple(rows), tuple(cols), tuple(Cell[n] for n in nodes))[nFrom,nTo].tolist()))
+
+# arc from the pickup to the dropoff of each person
+PickupToDropoff = {('Pickup',p,'Dropoff',p): 1 for p in range(1,len(People)+1)}
+
+# in the open trip a dummy node (depot) at zero distance from every node closes the tour,
+# so the trip starts in the node after the depot and ends in the node before it
+if not ClosedTour:
+    Depot = ('Depot', 0)
+    for n in nodes:
+        Distance[Depot+n] = 0
+        Distance[n+Depot] = 0
+    arcs  = arcs + [Depot+n for n in nodes] + [n+Depot for n in nodes]
+    nodes = nodes + [Depot]
+
+# arcs leaving and entering each node (to avoid scanning all the arcs in the constraints)
+ArcsOut = {n:[] for n in nodes}
+ArcsIn  = {n:[] for n in nodes}
+for (i,j,ii,jj) in arcs:
+    ArcsOut[i ,j ].append((i,j,ii,jj))
+    ArcsIn [ii,jj].append((i,j,ii,jj))
+
+#%% definitions
+
+# model
+mSDC = ConcreteModel(name='Self-driving cars (lazy subtour elimination)')
+
+# sets
+mSDC.n  = Set(initialize=nodes , doc='pickups and dropoffs (nodes)'      , dimen=2)
+mSDC.a  = Set(initialize=arcs  , doc='paths between nodes (arcs)'        , dimen=4, within=mSDC.n*mSDC.n)
+
+# parameters
+mSDC.pPeopToBuild= Param(mSDC.a, initialize=PickupToDropoff , doc='People to destination Building',default=0) #default=0 because not all the combinations are in the parameter initialization
+mSDC.pDistance   = Param(mSDC.a, initialize=Distance        , doc='distance between nodes'        ) #all the arcs are in the parameter initialization
+
+# variables (no stages in the trip)
+mSDC.vX = Var(mSDC.a, within=Binary, doc='wheter the path from i to j is included in the route')
+
+# constraints
+def ePeopToBuild_rule(mSDC,i,j,ii,jj):
+    if(mSDC.pPeopToBuild[i,j,ii,jj]==1):
+        return mSDC.vX[i,j,ii,jj]==1
+    else:
+        return Constraint.Skip
+mSDC.ePeopToBuild = Constraint(mSDC.a, rule=ePeopToBuild_rule, doc='Assigning a person an only building -> the person is dropped off right after being picked up')
+
+def eArrive_rule(mSDC,ii,jj):
+    return sum(mSDC.vX[i,j,ii,jj] for (i,j,ii,jj) in ArcsIn [ii,jj])==1
+mSDC.eArrive = Constraint(mSDC.n, rule=eArrive_rule, doc='we arrive once to each node')
+
+def eLeave_rule(mSDC,i,j):
+    return sum(mSDC.vX[i,j,ii,jj] for (i,j,ii,jj) in ArcsOut[i ,j ])==1
+mSDC.eLeave = Constraint(mSDC.n, rule=eLeave_rule, doc='we leave once from each node')
+
+# subtour elimination constraints (added in the solve loop)
+mSDC.eSubtour = ConstraintList(doc='subtour elimination cuts')
+
+# objective function
+def eObj_rule(mSDC):
+    return sum(mSDC.pDistance[i,j,ii,jj]*mSDC.vX[i,j,ii,jj]
+                for (i,j,ii,jj) in mSDC.a)
+mSDC.ObjFun = Objective(rule=eObj_rule, sense=minimize)
+
+#%% solver definition
+
+# CBC (no persistent interface, the model is sent again to the solver in each round)
+SolverName     = 'cbc'
+SolverPath_exe = 'C:\\cbc-win64\\cbc'
+Solver = SolverFactory(SolverName,executable=SolverPath_exe)
+Solver.options['allowableGap'] = 0
+
+# GUROBI persistent (pip install gurobipy): the model is loaded once and the cuts are added to the same solver instance
+#SolverName     = 'gurobi_persistent'
+#Solver = SolverFactory(SolverName)
+
+Persistent = SolverName.endswith('_persistent')
+if Persistent:
+    Solver.set_instance(mSDC)
+
+#%% solving the model (solve, look for subtours, add cuts, and solve again)
+
+def find_subtours(successor):
+    # cycles of the solution following the successor of each node
+    subtours  = []
+    unvisited = set(successor)
+    while unvisited:
+        tour = [unvisited.pop()]
+        while successor[tour[-1]] != tour[0]:
+            tour.append(successor[tour[-1]])
+            unvisited.remove(tour[-1])
+        subtours.append(tour)
+    return subtours
+
+Rounds = [] # number of subtours and solving time per round
+
+while True:
+    StartTime = time.time()
+
+    SolverResults = Solver.solve(mSDC, tee=False)
+
+    successor = {(i,j):(ii,jj) for (i,j,ii,jj) in mSDC.a if mSDC.vX[i,j,ii,jj].value > 0.5}
+    subtours  = find_subtours(successor)
+
+    Rounds.append({'round'   : len(Rounds)+1,
+                   'distance': value(mSDC.ObjFun),
+                   'subtours': len(subtours),
+                   'time'    : time.time()-StartTime})
+    print('Round {round}: distance {distance:.4f}, {subtours} subtour(s), {time:.2f} s'.format(**Rounds[-1]))
+
+    if len(subtours) == 1:
+        break
+
+    # the arcs inside each subtour must be less than its number of nodes
+    for tour in subtours:
+        mSDC.eSubtour.add(sum(mSDC.vX[n+nn] for n in tour for nn in tour if n+nn in mSDC.a) <= len(tour)-1)
+        if Persistent:
+            Solver.add_constraint(mSDC.eSubtour[len(mSDC.eSubtour)])
+
+#%% print results
+
+# total distance
+print('Total distance: ' + str(value(mSDC.ObjFun)))
+
+# cut rounds
+print('Cut rounds: {}, cuts added: {}, total solving time: {:.2f} s'.format(len(Rounds)-1, len(mSDC.eSubtour), sum(r['time'] for r in Rounds)))
+
+# the tour (sequence of nodes)
+tour = [Depot if not ClosedTour else nodes[0]]
+while successor[tour[-1]] != tour[0]:
+    tour.append(successor[tour[-1]])
+if not ClosedTour:
+    tour = tour[1:]
+[(n, Cell[n]) for n in tour]
+
+# %%
@@ -7,24 +7,36 @@ import pandas as pd
 #%% read input data
 
 # read and transform input data
-df_comb = (pd.read_csv('./inputs/combinations.csv',
-                    index_col=[0])
-        .fillna(0)
-        .stack()
-     )
+# combinations.csv is a points x lines matrix (1 if the line goes through the point). It is read in chunks of rows
+# and only the nonzero point-line incidences are kept (no dense points x lines intermediate)
+ChunkSize = 10000 # points read at once
+
+df_comb = pd.concat([chunk.melt(ignore_index=False, var_name='lines', value_name='comb').query('comb != 0 and comb == comb')
+                     for chunk in pd.read_csv('./inputs/combinations.csv', index_col=[0], chunksize=ChunkSize)])
+df_comb = df_comb.set_index('lines', append=True)['comb']
 df_comb.index.names = ['points','lines']
 
+df_points = pd.read_csv('./inputs/combinations.csv', index_col=[0], usecols=[0]) # every point (also without lines)
+
 df_cost = (pd.read_csv('./inputs/costs.csv',
                     index_col=[0])
      )
 
 
 # create lists and dicts
-I = list(df_comb.index.get_level_values('points').unique().map(str))
-J = list(df_comb.index.get_level_values('lines' ).unique().map(str))
+I = list(df_points.index.map(str))
+J = list(df_cost.index.map(str))
+
+IJ     = [(str(i),str(j)) for i,j in df_comb.index] # point-line incidences (only the nonzero ones)
+Comb_ij= dict(zip(IJ,df_comb))
+Cost_j = dict(zip(J,df_cost['Cost']))
 
-Comb_ij= dict(zip(df_comb.index,df_comb))
-Cost_j = dict(zip(df_cost.index,df_cost['Cost']))
+# lines that go through each point (adjacency built once)
+Li = {i: [] for i in I}
+for i,j in IJ:
+    Li[i].append(j)
+if not all(Li.values()):
+    raise ValueError('points without lines (the model is infeasible): {}'.format([i for i in I if not Li[i]]))
 
 #%% definitions
 
@@ -34,10 +46,11 @@ mMP = ConcreteModel(name='Metro Planning')
 # sets
 mMP.i  = Set(initialize=I, doc='key points')
 mMP.j  = Set(initialize=J, doc='lines'     )
+mMP.ij = Set(initialize=IJ, within=mMP.i*mMP.j, doc='point-line incidences')
 
 # parameters
-mMP.pCombination = Param(mMP.i, mMP.j, initialize=Comb_ij, doc='combination among points and lines',default=0)
-mMP.pLineCost    = Param(       mMP.j, initialize=Cost_j , doc='line construction cost'                      )
+mMP.pCombination = Param(mMP.ij, initialize=Comb_ij, doc='combination among points and lines')
+mMP.pLineCost    = Param(mMP.j , initialize=Cost_j , doc='line construction cost'            )
 
 # variables
 mMP.vX = Var(mMP.j, within=Binary, doc='wheter the line j is built or not')
@@ -46,11 +59,11 @@ mMP.vX = Var(mMP.j, within=Binary, doc='wheter the line j is built or not')
 def eConnections_rule(mMP,i):
     if(i!='P2'):
         return sum(mMP.vX[j]
-                    for j in mMP.j
+                    for j in Li[i]
                     if mMP.pCombination[i,j]==1)>=1
     else:
         return sum(mMP.vX[j]
-                    for j in mMP.j
+                    for j in Li[i]
                     if mMP.pCombination[i,j]==1)>=2
 
 mMP.eConnections = Constraint(mMP.i, rule=eConnections_rule, doc='minimum number of connections')
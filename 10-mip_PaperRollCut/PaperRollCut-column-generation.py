@@ -0,0 +1,72 @@
+#%% simple example in pyomo (column generation over cutting patterns)
+import numpy as np
+import time # count clock time
+from pyomo.opt import SolverFactory
+
+from prc_tools import column_generation, pattern_catalog
+
+#%% parameters
+
+# input values
+NumOrders =  10 # total number of orders
+MaxCuts   =   4 # maximum number of cuts in one roll
+RollLeng  =   3 # length per roll
+
+# lists
+orders = ['t'+str(i+1) for i in range(NumOrders)]
+
+rolls_per_order  = [  20,  30,  15,  25,  40,  25,  50,  15,  10,   5]
+lengt_per_order  = [0.50,0.75,1.00,1.25,1.50,1.75,2.00,2.25,2.50,2.75]
+
+demand  = dict(zip(orders,rolls_per_order))
+lengths = dict(zip(orders,lengt_per_order))
+
+# logic rule: if order of type 1 is carried out, include an order of either type 5 or type 9 (None -> no logic)
+LogicRule = ('t1',['t5','t9'])
+
+# start from every non-dominated pattern (cached catalog in pattern-cache) instead of the homogeneous ones
+UseCatalog = False
+
+min_rolls = round(sum(np.array(rolls_per_order)*np.array(lengt_per_order))/RollLeng,2)
+
+print("We need at least {} rolls (disregarding the waste).".format(min_rolls))
+
+#%% solver definition
+
+SolverName     = 'cbc'
+SolverPath_exe = 'C:\\cbc-win64\\cbc'
+Solver = SolverFactory(SolverName,executable=SolverPath_exe)
+
+#SolverName     = 'gurobi'
+#Solver = SolverFactory(SolverName)
+
+#%% column generation
+# the model size depends on the number of patterns and not on the number of rolls (NumRolls)
+
+StartTime = time.time()
+
+patterns = [tuple(a) for a in pattern_catalog(orders, lengths, RollLeng, MaxCuts, LogicRule).tolist()] if UseCatalog else None
+
+Results = column_generation(orders, demand, lengths, RollLeng, MaxCuts, Solver, logic=LogicRule, patterns=patterns)
+
+SolvingTime = time.time() - StartTime
+print('Total solving time... ', round(SolvingTime,2), 's')
+
+#%% print solution
+
+for it in Results['iterations']:
+    print('Iteration {iteration}: lp rolls {lp rolls:.2f}, reduced cost {reduced cost:.4f}, {time:.2f} s'.format(**it))
+
+print("generated patterns: {}".format(len(Results['patterns'])))
+print("lp bound (rolls): {}".format(Results['lp bound']))
+print("total rolls: {}".format(Results['num rolls']))
+print("total waste: {}".format(Results['waste']))
+
+# rolls per pattern
+plan = {}
+for a in Results['rolls']:
+    plan[a] = plan.get(a,0)+1
+for a,n in plan.items():
+    print("{:3d} rolls with {}".format(n, {i:c for i,c in zip(orders,a) if c > 0}))
+
+# %%
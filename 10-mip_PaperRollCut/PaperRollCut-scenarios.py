@@ -0,0 +1,134 @@
+#%% scenario runner for the paper roll cut example (cases 1-4 on one model, with incremental updates if the solver is persistent)
+import time # count clock time
+from concurrent.futures import ProcessPoolExecutor
+from pyomo.environ import value
+from pyomo.opt import SolverFactory
+
+import pandas as pd
+
+from prc_tools import best_fit_decreasing, build_model, set_case, warm_start, CASES
+
+#%% parameters
+
+# input values
+NumOrders =  10 # total number of orders
+MaxCuts   =   4 # maximum number of cuts in one roll
+RollLeng  =   3 # length per roll
+
+# lists
+orders = ['t'+str(i+1) for i in range(NumOrders)]
+
+rolls_per_order  = [  20,  30,  15,  25,  40,  25,  50,  15,  10,   5]
+lengt_per_order  = [0.50,0.75,1.00,1.25,1.50,1.75,2.00,2.25,2.50,2.75]
+
+# heuristic solution (warmstart) and number of rolls
+HeurRolls = best_fit_decreasing(orders, dict(zip(orders,rolls_per_order)), dict(zip(orders,lengt_per_order)), RollLeng, MaxCuts, logic=('t1',['t5','t9']))
+NumRolls  = len(HeurRolls)
+
+rolls = ['r'+str(j+1) for j in range(NumRolls)]
+
+# scenarios: the cases of PaperRollCut.py (prc_tools.CASES)
+Scenarios = CASES
+
+# False -> cases solved in sequence on the same model (and solver instance), each one starting from the previous solution
+# True  -> independent cases solved concurrently in separate processes
+Parallel = False
+
+#%% model (prc_tools.build_model, same formulation as PaperRollCut.py) and solver definition
+
+def new_model():
+    # model of the case 1 with the heuristic solution as warmstart
+    m = build_model(orders, dict(zip(orders,rolls_per_order)), dict(zip(orders,lengt_per_order)), RollLeng, MaxCuts, rolls, logic=('t1',['t5','t9']))
+    warm_start(m, HeurRolls, orders, dict(zip(orders,lengt_per_order)), RollLeng)
+    return m
+
+def solver_definition():
+    # CBC (no persistent interface, the whole model is sent to the solver in each case)
+    SolverName     = 'cbc'
+    SolverPath_exe = 'C:\\cbc-win64\\cbc'
+    Solver = SolverFactory(SolverName,executable=SolverPath_exe)
+    Solver.options['allowableGap'] = 0.05
+
+    # GUROBI persistent (pip install gurobipy): the changes between cases are sent as incremental updates
+    #SolverName     = 'gurobi_persistent'
+    #Solver = SolverFactory(SolverName)
+    #Solver.options['MIPGap'] = 0.05
+
+    return Solver, SolverName.endswith('_persistent')
+
+#%% scenarios
+
+def apply_scenario(m, Solver, Persistent, case):
+    # activates the objective function and the logic constraints of the case and fixes (or not) the aux binary
+    # variable (prc_tools.set_case). With a persistent solver only the components that change are updated in the solver
+    logic = {name: m.component(name).active for name in ('eLogicOpt1a', 'eLogicOpt1b', 'eLogicOpt2')}
+    fixed = m.vD[rolls[0]].fixed
+    set_case(m, case)
+    if not Persistent:
+        return
+
+    Solver.set_objective(m.component(Scenarios[case]['objective']))
+    for name, active in logic.items():
+        c = m.component(name)
+        if c.active and not active:
+            for j in c:
+                Solver.add_constraint(c[j])
+        elif active and not c.active:
+            for j in c:
+                Solver.remove_constraint(c[j])
+    if m.vD[rolls[0]].fixed != fixed:
+        for j in m.j:
+            Solver.update_var(m.vD[j])
+
+def solve_case(m, Solver, Persistent, case):
+    # applies the scenario, solves it starting from the current values, and returns the results of the case
+    StartTime = time.time()
+    apply_scenario(m, Solver, Persistent, case)
+    UpdateTime = time.time() - StartTime
+
+    StartTime = time.time()
+    SolverResults = Solver.solve(m, warmstart=True)
+    SolvingTime = time.time() - StartTime
+
+    return {'case'       : case,
+            'scenario'   : Scenarios[case]['doc'],
+            'objective'  : value(m.component(Scenarios[case]['objective'])),
+            'waste'      : sum(m.vW[j].value for j in m.j),
+            'rolls'      : sum(m.vY[j].value for j in m.j),
+            'update [s]' : UpdateTime,
+            'solve [s]'  : SolvingTime,
+            'termination': str(SolverResults.solver.termination_condition)}
+
+def run_case(case):
+    # independent case (own model and solver), to run in a separate process
+    StartTime = time.time()
+    m = new_model()
+    Solver, Persistent = solver_definition()
+    if Persistent:
+        Solver.set_instance(m)
+    BuildTime = time.time() - StartTime
+    return dict(solve_case(m, Solver, Persistent, case), **{'build [s]': BuildTime})
+
+def run_sequence(cases):
+    # cases on the same model and solver instance, each one starting from the previous solution
+    StartTime = time.time()
+    m = new_model()
+    Solver, Persistent = solver_definition()
+    if Persistent:
+        Solver.set_instance(m)
+    BuildTime = time.time() - StartTime
+    return [dict(solve_case(m, Solver, Persistent, case), **{'build [s]': BuildTime if case == cases[0] else 0.0}) for case in cases]
+
+#%% solving the cases (the process pool needs the main guard)
+
+if __name__ == '__main__':
+    if Parallel:
+        with ProcessPoolExecutor() as pool:
+            Results = list(pool.map(run_case, Scenarios))
+    else:
+        Results = run_sequence(list(Scenarios))
+
+    df_results = pd.DataFrame(Results).set_index('case')
+    print(df_results)
+
+# %%
@@ -0,0 +1,76 @@
+#%% benchmark of the symmetry breaking options in the paper roll cut example (cases 1-4)
+import time # count clock time
+from pyomo.environ import value
+from pyomo.opt import SolverFactory
+
+import pandas as pd
+
+from prc_tools import build_model, set_case, CASES
+
+#%% parameters
+
+# input values
+NumOrders =  10 # total number of orders
+NumRolls  = 150 # available number of paper rolls (assumption)
+MaxCuts   =   4 # maximum number of cuts in one roll
+RollLeng  =   3 # length per roll
+TimeLimit = 600 # time limit per solve (s)
+
+# lists
+orders = ['t'+str(i+1) for i in range(NumOrders)]
+rolls  = ['r'+str(j+1) for j in range(NumRolls) ]
+
+rolls_per_order  = [  20,  30,  15,  25,  40,  25,  50,  15,  10,   5]
+lengt_per_order  = [0.50,0.75,1.00,1.25,1.50,1.75,2.00,2.25,2.50,2.75]
+
+Cases   = ['Case1', 'Case2', 'Case3', 'Case4']
+Options = [None, 'rolls', 'waste', 'pieces'] # symmetry breaking options (see PaperRollCut.py)
+
+#%% model (prc_tools.build_model, same formulation as PaperRollCut.py)
+
+def case_model(case, option):
+    # model of the case with the symmetry breaking option (every roll used as warmstart)
+    m = build_model(orders, dict(zip(orders,rolls_per_order)), dict(zip(orders,lengt_per_order)), RollLeng, MaxCuts, rolls, logic=('t1',['t5','t9']), symmetry=option)
+    set_case(m, case)
+    for j in m.j:
+        m.vY[j].value = 1
+    return m
+
+#%% solver definition
+
+SolverName     = 'cbc'
+SolverPath_exe = 'C:\\cbc-win64\\cbc'
+Solver = SolverFactory(SolverName,executable=SolverPath_exe)
+Solver.options['allowableGap'] = 0.05
+Solver.options['seconds'     ] = TimeLimit
+
+#SolverName     = 'gurobi'
+#Solver = SolverFactory(SolverName)
+#Solver.options['MIPGap'   ] = 0.05
+#Solver.options['TimeLimit'] = TimeLimit
+
+#%% benchmark
+
+Results = []
+for case in Cases:
+    for option in Options:
+        m = case_model(case, option)
+
+        StartTime = time.time()
+        SolverResults = Solver.solve(m, warmstart=True)
+        SolvingTime = time.time() - StartTime
+        nodes = SolverResults.solver.statistics.branch_and_bound.number_of_created_subproblems
+
+        Results.append({'case'       : case,
+                        'symmetry'   : str(option),
+                        'objective'  : value(m.component(CASES[case]['objective'])),
+                        'rolls'      : sum(m.vY[j].value for j in m.j),
+                        'nodes'      : nodes if isinstance(nodes, int) else None, # not every solver reports it
+                        'time [s]'   : SolvingTime,
+                        'termination': str(SolverResults.solver.termination_condition)})
+        print(Results[-1])
+
+df_results = pd.DataFrame(Results).set_index(['case','symmetry'])
+print(df_results)
+
+# %%
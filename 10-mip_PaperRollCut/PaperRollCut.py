@@ -1,91 +1,92 @@
 #%% simple example in pyomo
 import numpy as np
 import time # count clock time
-from pyomo.environ import ConcreteModel, Set, Param, Var, NonNegativeReals, Binary, Integers, Constraint, Objective, minimize, Suffix, value
+from pyomo.environ import value
 from pyomo.opt import SolverFactory
 
+from prc_tools import best_fit_decreasing, master_lp, lp_rounding, build_model, symmetry_breaking, warm_start
+
 #%% parameters
 
 # input values
 NumOrders =  10 # total number of orders
-NumRolls  = 130 # available number of paper rolls (assumption). If we use 150 CBC can't solve it :( but, Gurobi does :)
+NumRolls  = None # available number of paper rolls (None -> rolls used by the heuristic solution, a valid upper bound)
 MaxCuts   =   4 # maximum number of cuts in one roll
 RollLeng  =   3 # length per roll
 
+# symmetry breaking per case (the rolls are interchangeable):
+# None     -> no ordering
+# 'rolls'  -> the used rolls go first
+# 'waste'  -> the used rolls go first and they are ordered by their waste
+# 'pieces' -> the used rolls go first and they are ordered by the pieces they cut
+SymmetryBreaking = {'Case1': None, 'Case2': None, 'Case3': None, 'Case4': None}
+
+# quick plan: pattern lp relaxation (lower bound) and rounding of its solution (feasible plan) before the MIP cases
+QuickPlan = True
+
 # lists
 orders = ['t'+str(i+1) for i in range(NumOrders)]
-rolls  = ['r'+str(j+1) for j in range(NumRolls) ]
 
 rolls_per_order  = [  20,  30,  15,  25,  40,  25,  50,  15,  10,   5]
 lengt_per_order  = [0.50,0.75,1.00,1.25,1.50,1.75,2.00,2.25,2.50,2.75]
 
 min_rolls = round(sum(np.array(rolls_per_order)*np.array(lengt_per_order))/3,2)
-max_orders_per_roll = np.floor(np.array([RollLeng for i in range(NumOrders)])/lengt_per_order)
 
 print("We need at least {} rolls (disregarding the waste). \
 So, the total number of rolls (NumRolls) to consider must be \
 greater than this number.".format(min_rolls))
 
-#%% model
+# heuristic solution (best fit decreasing respecting MaxCuts and the logic of the orders t1, t5 and t9)
+HeurRolls = best_fit_decreasing(orders, dict(zip(orders,rolls_per_order)), dict(zip(orders,lengt_per_order)), RollLeng, MaxCuts, logic=('t1',['t5','t9']))
+# lower bound of the used rolls without (False) and with (True) the logic of the orders t1, t5 and t9:
+# (name, rolls). The material bound is replaced by the pattern lp bound if the quick plan is run
+LPBound   = {logic: ('material bound', int(np.ceil(min_rolls))) for logic in (False, True)}
 
-# model definition
-m = ConcreteModel('Paper roll cut')
+print("The heuristic solution uses {} rolls (material lower bound {} rolls).".format(len(HeurRolls), LPBound[False][1]))
 
-# sets
-m.i = Set(initialize=orders,doc='type of order')
-m.j = Set(initialize=rolls ,doc='set of rolls' )
+if NumRolls is None:
+    NumRolls = len(HeurRolls)
 
-# parameters
-m.pRollsPerOrder = Param(m.i, initialize=dict(zip(orders,rolls_per_order)), doc='rolls per type of order')
-m.pLengtPerOrder = Param(m.i, initialize=dict(zip(orders,lengt_per_order)), doc='length per type of order')
-m.pMaxOrdersRoll = Param(m.i, initialize=dict(zip(orders,max_orders_per_roll)))
+rolls = ['r'+str(j+1) for j in range(NumRolls)]
 
-# variable definition
-m.vX = Var(m.i,m.j, within=Integers        , bounds=lambda m,i,j: (0,m.pMaxOrdersRoll[i]),doc='rolls of type i in roll j')
-m.vW = Var(    m.j, within=NonNegativeReals, bounds=(0,RollLeng)                         ,doc='waste in roll j')
-m.vD = Var(    m.j, within=Binary          , bounds=(0,1)                                ,doc='aux binary var to determine if an order t1 is used (1) or not (0) in the roll j')
-#m.vY = Var(    m.j, within=Binary          , bounds=(0,1)                                ,doc='binary var to determine if the roll j is used (1) or not (0)') # with no warmstart
-m.vY = Var(    m.j, within=Binary          , bounds=(0,1)                                ,doc='binary var to determine if the roll j is used (1) or not (0)',initialize=dict(zip(rolls,np.ones(NumRolls)))) #with warmstart
+def print_gap(case, logic=False):
+    # used rolls, lower bound (of the case with or without logic) and gap
+    used = sum([m.vY[j].value for j in m.j])
+    name, bound = LPBound[logic]
+    print("used rolls - {}: {:.0f}, {}: {}, gap: {:.2%}".format(case, used, name, bound, (used-bound)/used))
 
-#%% Objective Function and Constraints
+#%% Quick plan - pattern LP relaxation bound and residual rounding
+# the lp solution is rounded down and the residual demand is cut with the heuristic (logic of the orders t1, t5 and t9)
 
-# objective function (option 1 - Minimize waste)
-def eMinWaste(m):
-    return sum(m.vW[j] for j in m.j)
-m.eMinWaste = Objective(rule=eMinWaste, sense=minimize, doc='minimize the total waste')
+if QuickPlan:
+    SolverName     = 'cbc'
+    SolverPath_exe = 'C:\\cbc-win64\\cbc'
+    Solver = SolverFactory(SolverName,executable=SolverPath_exe)
 
-# objective function (option 2 - Minimize used rolls)
-def eMinNumMR(m):
-    return sum(m.vY[j] for j in m.j)
-m.eMinNumMR = Objective(rule=eMinNumMR, sense=minimize, doc='minimize the total used rolls')
+    #SolverName     = 'gurobi'
+    #Solver = SolverFactory(SolverName)
 
-# constraints
-def eNumPedi(m,i):
-    return sum(m.vX[i,j] for j in m.j) == m.pRollsPerOrder[i]
-m.eNumPedi = Constraint(m.i, rule=eNumPedi, doc='rolls demand per order type')
+    QuickResults = lp_rounding(orders, dict(zip(orders,rolls_per_order)), dict(zip(orders,lengt_per_order)), RollLeng, MaxCuts, Solver, logic=('t1',['t5','t9']))
 
-def eLimCort(m,j):
-    return sum(m.vX[i,j] for i in m.i) <= (MaxCuts+1)*m.vY[j]
-m.eLimCort = Constraint(m.j, rule=eLimCort, doc='maximum number of cuts in a roll')
+    print("quick plan - lp bound: {} rolls{}".format(QuickResults['lp bound'], '' if QuickResults['converged'] else ' (not converged, not a valid bound)'))
+    print("quick plan - rolls: {} ({} from the rounded lp solution), waste: {}".format(QuickResults['num rolls'], QuickResults['rounded'], QuickResults['waste']))
+    print("quick plan - gap: {:.2%}, time: {} s".format(QuickResults['gap'], round(QuickResults['time'],2)))
 
-def eLimLong(m,j):
-    return sum(m.pLengtPerOrder[i]*m.vX[i,j] for i in m.i) + m.vW[j] == RollLeng*m.vY[j]
-m.eLimLong = Constraint(m.j, rule=eLimLong, doc='lenght limit in a roll')
+    # pattern lp bounds for the gaps of the cases (the quick plan one has the logic, the other one is without it)
+    NoLogicBound, NoLogicConverged = master_lp(orders, dict(zip(orders,rolls_per_order)), dict(zip(orders,lengt_per_order)), RollLeng, MaxCuts, Solver)[2::2]
+    if NoLogicConverged:
+        LPBound[False] = ('pattern lp bound', int(np.ceil(NoLogicBound-1e-6)))
+    if QuickResults['converged']:
+        LPBound[True ] = ('pattern lp bound', QuickResults['lp bound'])
+    print("quick plan - lower bounds: {} rolls ({}, no logic), {} rolls ({}, logic)".format(LPBound[False][1], LPBound[False][0], LPBound[True][1], LPBound[True][0]))
 
-# option 1 to model the logic constraint using the aux binary variable
-# these constraints consider epsilon=1, m=-1 (lower bound) y M=4 (upper bound)
-def eLogicOpt1a(m,j):
-    return m.vX['t1',j]               <= (MaxCuts+1)*m.vD[j]
-m.eLogicOpt1a = Constraint(m.j, rule=eLogicOpt1a, doc='if order of type 1 is carried out, include an order of either type 5 or type 9 (option 1)')
+#%% model (assignment formulation in prc_tools.build_model: both objective functions, both options of the logic
+# rule and the symmetry breaking constraints, activated in each case)
 
-def eLogicOpt1b(m,j):
-    return m.vX['t5',j] +m.vX['t9',j] >=             m.vD[j]
-m.eLogicOpt1b = Constraint(m.j, rule=eLogicOpt1b, doc='if order of type 1 is carried out, include an order of either type 5 or type 9 (option 1)')
+m = build_model(orders, dict(zip(orders,rolls_per_order)), dict(zip(orders,lengt_per_order)), RollLeng, MaxCuts, rolls, logic=('t1',['t5','t9']))
 
-# option 2 to model the logic constraint (we can obtain eLogicOpt2 from eLogicOpt1a and eLogicOpt1b)
-def eLogicOpt2(m,j):
-    return (MaxCuts+1)*(m.vX['t5',j] +m.vX['t9',j]) >= m.vX['t1',j]
-m.eLogicOpt2 = Constraint(m.j, rule=eLogicOpt2, doc='if order of type 1 is carried out, include an order of either type 5 or type 9 (option 2)')
+# warmstart with the heuristic solution (the rolls not used by the heuristic are set to zero)
+warm_start(m, HeurRolls, orders, dict(zip(orders,lengt_per_order)), RollLeng)
 
 
 #%% Solution Case 1 - Objective function min waste and no logic included
@@ -102,6 +103,9 @@ m.eLogicOpt2.deactivate()
 # we fix the aux binary variable to zero
 m.vD.fix(0)
 
+# symmetry breaking
+symmetry_breaking(m, SymmetryBreaking['Case1'])
+
 # lp file
 m.write('PaperRollCut-minimize-waste-no-logic.lp', io_options={'symbolic_solver_labels': True})
 
@@ -139,6 +143,7 @@ m.pprint()
 print("Objective function - option minimize waste: {}".format(value(m.eMinWaste)))
 print("total waste - option minimize waste: {}".format(sum([m.vW[j].value for j in m.j])))
 print("total rolls - option minimize waste: {}".format(sum([m.vY[j].value for j in m.j])))
+print_gap("option minimize waste")
 
 #%% Solution Case 2 - Objective function min rolls and no logic included
 
@@ -146,6 +151,9 @@ print("total rolls - option minimize waste: {}".format(sum([m.vY[j].value for j
 m.eMinWaste.deactivate()
 m.eMinNumMR.activate()
 
+# symmetry breaking
+symmetry_breaking(m, SymmetryBreaking['Case2'])
+
 # lp file
 m.write('PaperRollCut-minimize-rolls-no-logic.lp', io_options={'symbolic_solver_labels': True})
 
@@ -165,6 +173,7 @@ m.pprint()
 print("Objective function - option minimize rolls: {}".format(value(m.eMinNumMR)))
 print("total waste - option minimize rolls: {}".format(sum([m.vW[j].value for j in m.j])))
 print("total rolls - option minimize rolls: {}".format(sum([m.vY[j].value for j in m.j])))
+print_gap("option minimize rolls")
 
 #%% Solution Case 3 - Objective function min rolls and logic included (option 1)
 
@@ -175,6 +184,13 @@ m.eLogicOpt1b.activate()
 # we unfix the aux binary variable
 m.vD.unfix()
 
+# aux binary values consistent with the previous solution (warmstart)
+for j in m.j:
+    m.vD[j].value = 1 if m.vX['t1',j].value > 0.5 else 0
+
+# symmetry breaking
+symmetry_breaking(m, SymmetryBreaking['Case3'])
+
 # lp file
 m.write('PaperRollCut-minimize-rolls-logic-option1.lp', io_options={'symbolic_solver_labels': True})
 
@@ -194,6 +210,7 @@ m.pprint()
 print("Objective function - option minimize rolls with logic (option 1): {}".format(value(m.eMinNumMR)))
 print("total waste - option minimize rolls with logic (option 1): {}".format(sum([m.vW[j].value for j in m.j])))
 print("total rolls - option minimize rolls with logic (option 1): {}".format(sum([m.vY[j].value for j in m.j])))
+print_gap("option minimize rolls with logic (option 1)", logic=True)
 
 #%% Solution Case 4 - Objective function min rolls and logic included (option 2)
 
@@ -205,6 +222,9 @@ m.eLogicOpt2.activate()
 # we fix the aux binary variable to zero since the logic 2 doesn't need it
 m.vD.fix(0)
 
+# symmetry breaking
+symmetry_breaking(m, SymmetryBreaking['Case4'])
+
 # lp file
 m.write('PaperRollCut-minimize-rolls-logic-option2.lp', io_options={'symbolic_solver_labels': True})
 
@@ -224,3 +244,4 @@ m.pprint()
 print("Objective function - option minimize rolls with logic (option 2): {}".format(value(m.eMinNumMR)))
 print("total waste - option minimize rolls with logic (option 2): {}".format(sum([m.vW[j].value for j in m.j])))
 print("total rolls - option minimize rolls with logic (option 2): {}".format(sum([m.vY[j].value for j in m.j])))
+print_gap("option minimize rolls with logic (option 2)", logic=True)
@@ -0,0 +1,353 @@
+#%% helper functions for the paper roll cut examples (pattern based formulation)
+import numpy as np
+import os
+import hashlib
+import time # count clock time
+from pyomo.environ import ConcreteModel, Set, Param, Var, NonNegativeReals, NonNegativeIntegers, Integers, Binary, Constraint, Objective, minimize, maximize, Suffix, value
+
+# a cutting pattern is a tuple with the number of pieces of each type of order in one roll
+# and the logic rule is a pair (order, [orders]): if the order is cut in a roll,
+# at least one of the other orders has to be cut in the same roll (e.g. ('t1',['t5','t9']))
+
+EPS = 1e-6
+
+#%% patterns
+
+def initial_patterns(orders, lengths, RollLeng, MaxCuts, logic=None):
+    """one homogeneous pattern per type of order (as many pieces as fit). The order of the logic
+    rule is combined with one piece of the shortest order that it needs"""
+    patterns = []
+    for t,i in enumerate(orders):
+        a = [0]*len(orders)
+        if logic is not None and i == logic[0]:
+            r = min(logic[1], key=lambda r: lengths[r])
+            a[orders.index(r)] = 1
+            a[t] = int(min(np.floor((RollLeng-lengths[r])/lengths[i]+EPS), MaxCuts))
+        else:
+            a[t] = int(min(np.floor(RollLeng/lengths[i]+EPS), MaxCuts+1))
+        patterns.append(tuple(a))
+    return patterns
+
+def enumerate_patterns(orders, lengths, RollLeng, MaxCuts, logic=None):
+    """matrix with every feasible pattern (one row per pattern) that is not dominated, i.e., no other
+    piece fits in its waste. The patterns are built with numpy adding one type of order at a time"""
+    L = np.array([lengths[i] for i in orders])
+    P = np.zeros((1,len(orders)), dtype=np.int16)
+    for t in range(len(orders)):
+        k = np.arange(int(min(np.floor(RollLeng/L[t]+EPS), MaxCuts+1))+1, dtype=np.int16)
+        P = np.repeat(P, len(k), axis=0)
+        P[:,t] = np.tile(k, len(P)//len(k))
+        P = P[(P.sum(axis=1) <= MaxCuts+1) & (P @ L <= RollLeng+EPS)]
+
+    # logic rule: the order needs one of the other orders in the same roll
+    trigger = np.zeros(len(orders), dtype=bool)
+    if logic is not None:
+        trigger[orders.index(logic[0])] = True
+        needs   = [orders.index(r) for r in logic[1]]
+        P = P[(P[:,trigger].sum(axis=1) == 0) | (P[:,needs].sum(axis=1) > 0)]
+
+    # dominated patterns: one more piece fits (the order of the logic rule only if the roll has one of the others)
+    waste = RollLeng - P @ L
+    cuts  = P.sum(axis=1) < MaxCuts+1
+    fits  = waste >= L[~trigger].min()-EPS
+    if logic is not None:
+        fits |= (waste >= L[trigger].min()-EPS) & (P[:,needs].sum(axis=1) > 0)
+    return P[~(cuts & fits) & (P.sum(axis=1) > 0)]
+
+def pattern_catalog(orders, lengths, RollLeng, MaxCuts, logic=None, CacheDir='pattern-cache'):
+    """patterns from enumerate_patterns cached on disk (keyed by the input parameters)
+    and memory-mapped when they are loaded again"""
+    key  = repr(([lengths[i] for i in orders], RollLeng, MaxCuts,
+                 None if logic is None else (orders.index(logic[0]), sorted(orders.index(r) for r in logic[1]))))
+    file = os.path.join(CacheDir, 'patterns-'+hashlib.sha1(key.encode()).hexdigest()+'.npy')
+    if not os.path.exists(file):
+        os.makedirs(CacheDir, exist_ok=True)
+        np.save(file, enumerate_patterns(orders, lengths, RollLeng, MaxCuts, logic))
+    return np.load(file, mmap_mode='r')
+
+#%% heuristic
+
+def best_fit_decreasing(orders, demand, lengths, RollLeng, MaxCuts, logic=None):
+    """feasible list of rolls (one pattern per roll) cutting exactly the demand. The pieces of the order
+    of the logic rule are placed first in rolls with one piece of the other orders (the shortest first),
+    then the rest of the pieces go, from the longest to the shortest, to the roll with the least
+    remaining length where they fit (a new roll if none)"""
+    rolls = [] # [pieces per order, remaining length]
+    left  = dict(demand)
+
+    def fits(roll, i):
+        return sum(roll[0]) < MaxCuts+1 and lengths[i] <= roll[1]+EPS
+
+    def cut(roll, i):
+        roll[0][orders.index(i)] += 1
+        roll[1] -= lengths[i]
+        left[i] -= 1
+
+    if logic is not None:
+        for r in sorted(logic[1], key=lambda r: lengths[r]):
+            while left[logic[0]] > 0 and left[r] > 0:
+                roll = [[0]*len(orders), RollLeng]
+                cut(roll, r)
+                while left[logic[0]] > 0 and fits(roll, logic[0]):
+                    cut(roll, logic[0])
+                rolls.append(roll)
+        if left[logic[0]] > 0:
+            raise ValueError('not enough pieces of {} to cut all the pieces of {}'.format(logic[1], logic[0]))
+
+    for i in sorted(orders, key=lambda i: -lengths[i]):
+        while left[i] > 0:
+            candidates = [roll for roll in rolls if fits(roll, i)]
+            if candidates:
+                roll = min(candidates, key=lambda roll: roll[1])
+            else:
+                roll = [[0]*len(orders), RollLeng]
+                rolls.append(roll)
+            cut(roll, i)
+
+    return [tuple(roll[0]) for roll in rolls]
+
+#%% assignment formulation (one variable per type of order and roll, as in PaperRollCut.py)
+
+# cases of the examples: active objective function, active logic constraints, and whether the aux binary variable is fixed to zero
+CASES = {
+    'Case1': {'objective': 'eMinWaste', 'logic': [                          ], 'fix_vD': True , 'doc': 'minimize waste and no logic'},
+    'Case2': {'objective': 'eMinNumMR', 'logic': [                          ], 'fix_vD': True , 'doc': 'minimize rolls and no logic'},
+    'Case3': {'objective': 'eMinNumMR', 'logic': ['eLogicOpt1a','eLogicOpt1b'], 'fix_vD': False, 'doc': 'minimize rolls and logic (option 1)'},
+    'Case4': {'objective': 'eMinNumMR', 'logic': ['eLogicOpt2'              ], 'fix_vD': True , 'doc': 'minimize rolls and logic (option 2)'},
+    }
+
+def build_model(orders, demand, lengths, RollLeng, MaxCuts, rolls, logic=('t1',['t5','t9']), symmetry=None):
+    """assignment model with both objective functions, both options of the logic rule and the symmetry breaking
+    constraints. It starts as the case 1 (minimize waste, no logic and the aux binary variable fixed to zero)
+    with the symmetry breaking option (None, 'rolls', 'waste' or 'pieces')"""
+    m = ConcreteModel('Paper roll cut')
+
+    # sets
+    m.i = Set(initialize=orders,doc='type of order')
+    m.j = Set(initialize=rolls ,doc='set of rolls' )
+
+    # parameters
+    m.pRollsPerOrder = Param(m.i, initialize=demand , doc='rolls per type of order')
+    m.pLengtPerOrder = Param(m.i, initialize=lengths, doc='length per type of order')
+    m.pMaxOrdersRoll = Param(m.i, initialize={i: np.floor(RollLeng/lengths[i]) for i in orders})
+
+    # variable definition
+    m.vX = Var(m.i,m.j, within=Integers        , bounds=lambda m,i,j: (0,m.pMaxOrdersRoll[i]),doc='rolls of type i in roll j')
+    m.vW = Var(    m.j, within=NonNegativeReals, bounds=(0,RollLeng)                         ,doc='waste in roll j')
+    m.vD = Var(    m.j, within=Binary          , bounds=(0,1)                                ,doc='aux binary var to determine if the order of the logic rule is used (1) or not (0) in the roll j')
+    m.vY = Var(    m.j, within=Binary          , bounds=(0,1)                                ,doc='binary var to determine if the roll j is used (1) or not (0)')
+
+    # objective functions (option 1 - minimize waste, option 2 - minimize used rolls)
+    m.eMinWaste = Objective(expr=sum(m.vW[j] for j in m.j), sense=minimize, doc='minimize the total waste')
+    m.eMinNumMR = Objective(expr=sum(m.vY[j] for j in m.j), sense=minimize, doc='minimize the total used rolls')
+
+    # constraints
+    m.eNumPedi = Constraint(m.i, rule=lambda m,i: sum(m.vX[i,j] for j in m.j) == m.pRollsPerOrder[i], doc='rolls demand per order type')
+    m.eLimCort = Constraint(m.j, rule=lambda m,j: sum(m.vX[i,j] for i in m.i) <= (MaxCuts+1)*m.vY[j], doc='maximum number of cuts in a roll')
+    m.eLimLong = Constraint(m.j, rule=lambda m,j: sum(m.pLengtPerOrder[i]*m.vX[i,j] for i in m.i) + m.vW[j] == RollLeng*m.vY[j], doc='lenght limit in a roll')
+
+    # logic rule: option 1 with the aux binary variable, option 2 obtained from eLogicOpt1a and eLogicOpt1b
+    m.eLogicOpt1a = Constraint(m.j, rule=lambda m,j: m.vX[logic[0],j] <= (MaxCuts+1)*m.vD[j], doc='if the order of the logic rule is cut, include one of the other orders (option 1)')
+    m.eLogicOpt1b = Constraint(m.j, rule=lambda m,j: sum(m.vX[r,j] for r in logic[1]) >= m.vD[j], doc='if the order of the logic rule is cut, include one of the other orders (option 1)')
+    m.eLogicOpt2  = Constraint(m.j, rule=lambda m,j: (MaxCuts+1)*sum(m.vX[r,j] for r in logic[1]) >= m.vX[logic[0],j], doc='if the order of the logic rule is cut, include one of the other orders (option 2)')
+
+    # symmetry breaking constraints (ordering of the rolls)
+    last = m.j.last()
+    m.eSymRolls  = Constraint(m.j, rule=lambda m,j: m.vY[j] >= m.vY[m.j.next(j)] if j != last else Constraint.Skip, doc='the used rolls go first')
+    m.eSymWaste  = Constraint(m.j, rule=lambda m,j: m.vW[j] >= m.vW[m.j.next(j)] if j != last else Constraint.Skip, doc='rolls ordered by their waste')
+    m.eSymPieces = Constraint(m.j, rule=lambda m,j: sum(m.i.ord(i)*m.vX[i,j] for i in m.i) >= sum(m.i.ord(i)*m.vX[i,m.j.next(j)] for i in m.i) if j != last else Constraint.Skip, doc='rolls ordered by the pieces they cut')
+
+    # starting point: case 1
+    m.logic = logic
+    set_case(m, 'Case1')
+    symmetry_breaking(m, symmetry)
+    return m
+
+def symmetry_breaking(m, option):
+    """activates the symmetry breaking constraints of the option (None, 'rolls', 'waste' or 'pieces')"""
+    m.eSymRolls .deactivate()
+    m.eSymWaste .deactivate()
+    m.eSymPieces.deactivate()
+    if option is not None:
+        m.eSymRolls .activate()
+    if option == 'waste':
+        m.eSymWaste .activate()
+    if option == 'pieces':
+        m.eSymPieces.activate()
+
+def set_case(m, case):
+    """activates the objective function and the logic constraints of the case and fixes (or not) the aux binary variable.
+    When it is unfixed, its values are made consistent with the current solution (warmstart)"""
+    for name in ('eMinWaste', 'eMinNumMR', 'eLogicOpt1a', 'eLogicOpt1b', 'eLogicOpt2'):
+        if name == CASES[case]['objective'] or name in CASES[case]['logic']:
+            m.component(name).activate()
+        else:
+            m.component(name).deactivate()
+    if CASES[case]['fix_vD']:
+        m.vD.fix(0)
+    else:
+        m.vD.unfix()
+        for j in m.j:
+            m.vD[j].value = 1 if (m.vX[m.logic[0],j].value or 0) > 0.5 else 0
+
+def warm_start(m, rolls_cut, orders, lengths, RollLeng):
+    """values of the variables from a list of rolls (pieces of each type of order), the other rolls are not used"""
+    for j,a in zip(m.j, list(rolls_cut)+[(0,)*len(orders)]*(len(m.j)-len(rolls_cut))):
+        for i,n in zip(orders,a):
+            m.vX[i,j].value = n
+        m.vY[j].value = 1 if sum(a) > 0 else 0
+        m.vW[j].value = (RollLeng-sum(lengths[i]*n for i,n in zip(orders,a))) if sum(a) > 0 else 0
+        m.vD[j].value = 1 if a[orders.index(m.logic[0])] > 0 else 0
+
+#%% column generation (Gilmore-Gomory)
+
+def master_model(patterns, orders, demand, integer=False):
+    """master problem: number of rolls cut with each pattern to cover the demand"""
+    mm = ConcreteModel('Paper roll cut (master)')
+
+    mm.i = Set(initialize=orders                , doc='type of order')
+    mm.p = Set(initialize=range(len(patterns))  , doc='cutting patterns')
+
+    mm.pDemand  = Param(mm.i,       initialize=demand, doc='rolls per type of order')
+    mm.pPattern = Param(mm.i, mm.p, initialize={(i,p):patterns[p][t] for t,i in enumerate(orders) for p in mm.p}, doc='pieces of order i in pattern p')
+
+    mm.vY = Var(mm.p, within=NonNegativeIntegers if integer else NonNegativeReals, doc='rolls cut with pattern p')
+
+    def eNumPedi(mm,i):
+        return sum(mm.pPattern[i,p]*mm.vY[p] for p in mm.p if mm.pPattern[i,p] > 0) >= mm.pDemand[i]
+    mm.eNumPedi = Constraint(mm.i, rule=eNumPedi, doc='rolls demand per order type')
+
+    def eMinNumMR(mm):
+        return sum(mm.vY[p] for p in mm.p)
+    mm.eMinNumMR = Objective(rule=eMinNumMR, sense=minimize, doc='minimize the total used rolls')
+
+    # duals of the demand (only in the lp relaxation)
+    if not integer:
+        mm.dual = Suffix(direction=Suffix.IMPORT)
+    return mm
+
+def pricing_model(duals, orders, lengths, RollLeng, MaxCuts, logic=None):
+    """bounded knapsack: pattern with the largest value of the demand duals"""
+    k = ConcreteModel('Paper roll cut (pricing)')
+
+    k.i = Set(initialize=orders, doc='type of order')
+
+    k.vA = Var(k.i, within=NonNegativeIntegers, bounds=lambda k,i: (0,np.floor(RollLeng/lengths[i]+EPS)), doc='pieces of order i in the new pattern')
+    k.vD = Var(     within=Binary                                                                       , doc='aux binary var to determine if the order of the logic rule is used')
+
+    k.eLimCort = Constraint(expr=sum(k.vA[i] for i in k.i) <= MaxCuts+1, doc='maximum number of cuts in a roll')
+    k.eLimLong = Constraint(expr=sum(lengths[i]*k.vA[i] for i in k.i) <= RollLeng, doc='lenght limit in a roll')
+
+    # same logic as eLogicOpt1a and eLogicOpt1b in the assignment formulation
+    if logic is not None:
+        k.eLogicOpt1a = Constraint(expr=k.vA[logic[0]] <= (MaxCuts+1)*k.vD, doc='if the order of the logic rule is cut, include one of the other orders')
+        k.eLogicOpt1b = Constraint(expr=sum(k.vA[i] for i in logic[1]) >= k.vD, doc='if the order of the logic rule is cut, include one of the other orders')
+    else:
+        k.vD.fix(0)
+
+    k.ObjFun = Objective(expr=sum(duals[i]*k.vA[i] for i in k.i), sense=maximize, doc='value of the pattern with the duals')
+    return k
+
+def rolls_from_solution(patterns, counts, orders, lengths, demand, logic=None):
+    """list of rolls (one pattern per roll) removing the pieces above the demand (they become waste).
+    A piece is not removed if the roll would break the logic rule"""
+    rolls   = [list(patterns[p]) for p,n in enumerate(counts) for r in range(int(round(n)))]
+    surplus = {i: sum(a[t] for a in rolls)-demand[i] for t,i in enumerate(orders)}
+    for t,i in enumerate(orders):
+        for a in rolls:
+            while surplus[i] > 0 and a[t] > 0:
+                a[t] -= 1
+                if logic is not None and i in logic[1] and a[orders.index(logic[0])] > 0 \
+                        and sum(a[orders.index(r)] for r in logic[1]) == 0:
+                    a[t] += 1
+                    break
+                surplus[i] -= 1
+    return [tuple(a) for a in rolls if sum(a) > 0]
+
+def master_lp(orders, demand, lengths, RollLeng, MaxCuts, Solver, logic=None, MaxIter=200, patterns=None):
+    """LP relaxation of the master problem by column generation. The master LP is solved with the
+    current patterns and new patterns are priced with the knapsack until no pattern has a negative
+    reduced cost (converged). It returns the patterns, the LP solution, the LP rolls and the iterations"""
+    patterns   = list(patterns) if patterns is not None else initial_patterns(orders, lengths, RollLeng, MaxCuts, logic)
+    iterations = []
+    converged  = False
+
+    for it in range(MaxIter):
+        StartTime = time.time()
+
+        mm = master_model(patterns, orders, demand)
+        Solver.solve(mm)
+        duals = {i: mm.dual[mm.eNumPedi[i]] for i in orders}
+
+        k = pricing_model(duals, orders, lengths, RollLeng, MaxCuts, logic)
+        Solver.solve(k)
+        new = tuple(int(round(k.vA[i].value)) for i in orders)
+
+        iterations.append({'iteration': it+1, 'lp rolls': value(mm.eMinNumMR), 'reduced cost': 1-value(k.ObjFun), 'time': time.time()-StartTime})
+        if value(k.ObjFun) <= 1+EPS or new in patterns:
+            converged = True
+            break
+        patterns.append(new)
+
+    return patterns, [mm.vY[p].value for p in mm.p], value(mm.eMinNumMR), iterations, converged
+
+def column_generation(orders, demand, lengths, RollLeng, MaxCuts, Solver, logic=None, MaxIter=200, patterns=None):
+    """column generation over cutting patterns (master_lp) and then the master is solved with integer
+    variables over the generated patterns. With an exact demand, minimizing the rolls also minimizes the total waste"""
+    patterns, lp, LPBound, iterations, converged = master_lp(orders, demand, lengths, RollLeng, MaxCuts, Solver, logic, MaxIter, patterns)
+
+    # integer master over the generated patterns (warm start rounding up the lp solution)
+    StartTime = time.time()
+    mm = master_model(patterns, orders, demand, integer=True)
+    for p in mm.p:
+        mm.vY[p].value = np.ceil(lp[p]-EPS)
+    Solver.solve(mm, warmstart=True)
+    IntegerTime = time.time()-StartTime
+
+    rolls = rolls_from_solution(patterns, [mm.vY[p].value for p in mm.p], orders, lengths, demand, logic)
+    return {'patterns'    : patterns,
+            'rolls'       : rolls,
+            'num rolls'   : len(rolls),
+            'lp bound'    : int(np.ceil(LPBound-EPS)),
+            'converged'   : converged,
+            'waste'       : sum(RollLeng-sum(lengths[i]*a[t] for t,i in enumerate(orders)) for a in rolls),
+            'iterations'  : iterations,
+            'integer time': IntegerTime}
+
+#%% lp relaxation and residual rounding
+
+def lp_rounding(orders, demand, lengths, RollLeng, MaxCuts, Solver, logic=None, MaxIter=200):
+    """fast feasible plan with a provable gap. The pattern LP relaxation (master_lp) gives the bound,
+    its solution is rounded down and the residual demand is cut with best_fit_decreasing. If the residual
+    pieces of the logic rule can not be placed, rounded rolls with the other orders go back to the residual.
+    The lp bound is only valid if the column generation converged"""
+    StartTime = time.time()
+    patterns, lp, LPBound, iterations, converged = master_lp(orders, demand, lengths, RollLeng, MaxCuts, Solver, logic, MaxIter)
+
+    # rounded down rolls (without the pieces above the demand)
+    rounded = rolls_from_solution(patterns, [np.floor(y+EPS) for y in lp], orders, lengths, demand, logic)
+
+    while True:
+        residual = {i: demand[i]-sum(a[t] for a in rounded) for t,i in enumerate(orders)}
+        try:
+            rolls = rounded + best_fit_decreasing(orders, residual, lengths, RollLeng, MaxCuts, logic)
+            break
+        except ValueError:
+            needs = [orders.index(r) for r in logic[1]]
+            back  = min((a for a in rounded if sum(a[t] for t in needs) > 0), key=lambda a: a[orders.index(logic[0])], default=None)
+            if back is None: # every piece of the other orders is already in the residual
+                raise
+            rounded.remove(back)
+
+    bound = int(np.ceil(LPBound-EPS))
+    return {'lp bound'  : bound,
+            'converged' : converged,
+            'rolls'     : rolls,
+            'num rolls' : len(rolls),
+            'rounded'   : len(rounded),
+            'gap'       : (len(rolls)-bound)/len(rolls),
+            'waste'     : sum(RollLeng-sum(lengths[i]*a[t] for t,i in enumerate(orders)) for a in rolls),
+            'iterations': iterations,
+            'time'      : time.time()-StartTime}
+
+# %%